@@ -0,0 +1,128 @@
+"""baseline schema
+
+The tables as `Base.metadata.create_all` created them before migrations were introduced.
+Databases created that way are brought under migration control with `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("address", sa.String(), nullable=True),
+        sa.Column("username", sa.String(), nullable=True),
+        sa.Column("phone", sa.String(), nullable=True),
+        sa.Column("password", sa.String(), nullable=True),
+        sa.Column(
+            "role", sa.Enum("ADMIN", "SELLER", "BUYER", name="roleenum"), nullable=True
+        ),
+        sa.Column("delete", sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"])
+    op.create_index("ix_users_phone", "users", ["phone"])
+
+    op.create_table(
+        "products",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("image", sa.String(), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("delete", sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_products_id", "products", ["id"])
+
+    op.create_table(
+        "seller_inventory",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("seller_id", sa.String(), nullable=True),
+        sa.Column("product_id", sa.String(), nullable=True),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("delete", sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.ForeignKeyConstraint(["seller_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_seller_inventory_id", "seller_inventory", ["id"])
+
+    op.create_table(
+        "cart",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("buyer_id", sa.String(), nullable=True),
+        sa.Column("seller_inventory_id", sa.String(), nullable=True),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["buyer_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["seller_inventory_id"], ["seller_inventory.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_cart_id", "cart", ["id"])
+
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("buyer_id", sa.String(), nullable=True),
+        sa.Column("seller_id", sa.String(), nullable=True),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "PENDING",
+                "CONFIRMED",
+                "READY",
+                "DONE",
+                "CANCELLED",
+                "AUTO_CANCELLED",
+                name="orderstatus",
+            ),
+            nullable=True,
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["buyer_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["seller_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_orders_id", "orders", ["id"])
+
+    op.create_table(
+        "order_items",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("order_id", sa.String(), nullable=False),
+        sa.Column("seller_inventory_id", sa.String(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("price_at_purchase", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["order_id"], ["orders.id"]),
+        sa.ForeignKeyConstraint(["seller_inventory_id"], ["seller_inventory.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_order_items_id", "order_items", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("order_items")
+    op.drop_table("orders")
+    op.drop_table("cart")
+    op.drop_table("seller_inventory")
+    op.drop_table("products")
+    op.drop_table("users")
+    sa.Enum(name="orderstatus").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="roleenum").drop(op.get_bind(), checkfirst=True)
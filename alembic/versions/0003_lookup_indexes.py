@@ -0,0 +1,104 @@
+"""foreign key, lookup, sort and uniqueness indexes
+
+Adding the unique constraints fails if a cart already holds the same inventory twice or a
+seller has two inventories of the same product, merge those rows before upgrading.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_active_index(name: str, table: str, columns: list[str]) -> None:
+    # partial index over the rows that are not soft deleted
+    op.create_index(
+        name,
+        table,
+        columns,
+        postgresql_where=sa.text("delete = false"),
+        sqlite_where=sa.text('"delete" = 0'),
+    )
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("cart") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_cart_buyer_id_seller_inventory_id", ["buyer_id", "seller_inventory_id"]
+        )
+    op.create_index("ix_cart_seller_inventory_id", "cart", ["seller_inventory_id"])
+
+    with op.batch_alter_table("seller_inventory") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_seller_inventory_seller_id_product_id", ["seller_id", "product_id"]
+        )
+    op.create_index(
+        "ix_seller_inventory_product_id", "seller_inventory", ["product_id"]
+    )
+    op.create_index(
+        "ix_seller_inventory_seller_id_price",
+        "seller_inventory",
+        ["seller_id", "price", "id"],
+    )
+    op.create_index(
+        "ix_seller_inventory_seller_id_quantity",
+        "seller_inventory",
+        ["seller_id", "quantity", "id"],
+    )
+    create_active_index(
+        "ix_seller_inventory_price_active", "seller_inventory", ["price", "id"]
+    )
+
+    op.create_index("ix_orders_status", "orders", ["status"])
+    op.create_index("ix_orders_created_at", "orders", ["created_at"])
+    op.create_index(
+        "ix_orders_seller_id_created_at", "orders", ["seller_id", "created_at", "id"]
+    )
+    op.create_index(
+        "ix_orders_buyer_id_created_at", "orders", ["buyer_id", "created_at", "id"]
+    )
+
+    op.create_index("ix_order_items_order_id", "order_items", ["order_id"])
+    op.create_index(
+        "ix_order_items_seller_inventory_id", "order_items", ["seller_inventory_id"]
+    )
+
+    create_active_index("ix_products_name_active", "products", ["name", "id"])
+    create_active_index("ix_users_username_active", "users", ["username", "id"])
+    create_active_index("ix_users_name_active", "users", ["name", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_name_active", table_name="users")
+    op.drop_index("ix_users_username_active", table_name="users")
+    op.drop_index("ix_products_name_active", table_name="products")
+
+    op.drop_index("ix_order_items_seller_inventory_id", table_name="order_items")
+    op.drop_index("ix_order_items_order_id", table_name="order_items")
+
+    op.drop_index("ix_orders_buyer_id_created_at", table_name="orders")
+    op.drop_index("ix_orders_seller_id_created_at", table_name="orders")
+    op.drop_index("ix_orders_created_at", table_name="orders")
+    op.drop_index("ix_orders_status", table_name="orders")
+
+    op.drop_index("ix_seller_inventory_price_active", table_name="seller_inventory")
+    op.drop_index("ix_seller_inventory_seller_id_quantity", table_name="seller_inventory")
+    op.drop_index("ix_seller_inventory_seller_id_price", table_name="seller_inventory")
+    op.drop_index("ix_seller_inventory_product_id", table_name="seller_inventory")
+    with op.batch_alter_table("seller_inventory") as batch_op:
+        batch_op.drop_constraint("uq_seller_inventory_seller_id_product_id", type_="unique")
+
+    op.drop_index("ix_cart_seller_inventory_id", table_name="cart")
+    with op.batch_alter_table("cart") as batch_op:
+        batch_op.drop_constraint("uq_cart_buyer_id_seller_inventory_id", type_="unique")
@@ -0,0 +1,50 @@
+"""stock_reservations
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_reservations",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("buyer_id", sa.String(), nullable=False),
+        sa.Column("seller_inventory_id", sa.String(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["buyer_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["seller_inventory_id"], ["seller_inventory.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "buyer_id",
+            "seller_inventory_id",
+            name="uq_stock_reservations_buyer_id_seller_inventory_id",
+        ),
+    )
+    op.create_index("ix_stock_reservations_id", "stock_reservations", ["id"])
+    op.create_index(
+        "ix_stock_reservations_seller_inventory_id",
+        "stock_reservations",
+        ["seller_inventory_id"],
+    )
+    op.create_index(
+        "ix_stock_reservations_expires_at", "stock_reservations", ["expires_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stock_reservations")
@@ -0,0 +1,45 @@
+"""seller_inventory.shard_count and seller_inventory_shards
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("seller_inventory") as batch_op:
+        batch_op.add_column(
+            sa.Column("shard_count", sa.Integer(), nullable=False, server_default="1")
+        )
+    op.create_table(
+        "seller_inventory_shards",
+        sa.Column("seller_inventory_id", sa.String(), nullable=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["seller_inventory_id"], ["seller_inventory.id"]),
+        sa.PrimaryKeyConstraint("seller_inventory_id", "shard"),
+    )
+
+
+def downgrade() -> None:
+    # fold the sub-counters back into seller_inventory.quantity before dropping them
+    op.execute(
+        "UPDATE seller_inventory SET quantity = quantity + COALESCE(("
+        "SELECT SUM(s.quantity) FROM seller_inventory_shards s"
+        " WHERE s.seller_inventory_id = seller_inventory.id), 0)"
+    )
+    op.drop_table("seller_inventory_shards")
+    with op.batch_alter_table("seller_inventory") as batch_op:
+        batch_op.drop_column("shard_count")
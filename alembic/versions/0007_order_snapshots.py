@@ -0,0 +1,60 @@
+"""orders.total/item_count and order_items product snapshots
+
+Existing orders and order items are backfilled from order_items and the current products.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.add_column(
+            sa.Column("total", sa.Float(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("item_count", sa.Integer(), nullable=False, server_default="0")
+        )
+    with op.batch_alter_table("order_items") as batch_op:
+        batch_op.add_column(sa.Column("product_name", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("product_image", sa.String(), nullable=True))
+        batch_op.add_column(
+            sa.Column("product_description", sa.String(), nullable=True)
+        )
+
+    op.execute(
+        "UPDATE orders SET"
+        " total = COALESCE((SELECT SUM(i.quantity * i.price_at_purchase)"
+        " FROM order_items i WHERE i.order_id = orders.id), 0),"
+        " item_count = COALESCE((SELECT SUM(i.quantity)"
+        " FROM order_items i WHERE i.order_id = orders.id), 0)"
+    )
+    for column in ("name", "image", "description"):
+        op.execute(
+            f"UPDATE order_items SET product_{column} = ("
+            f"SELECT p.{column} FROM seller_inventory s JOIN products p ON p.id = s.product_id"
+            " WHERE s.id = order_items.seller_inventory_id)"
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("order_items") as batch_op:
+        batch_op.drop_column("product_description")
+        batch_op.drop_column("product_image")
+        batch_op.drop_column("product_name")
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.drop_column("item_count")
+        batch_op.drop_column("total")
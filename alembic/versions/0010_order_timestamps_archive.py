@@ -0,0 +1,118 @@
+"""server-side order timestamps, orders_archive and order_items_archive
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.alter_column(
+            "created_at", existing_type=sa.DateTime(), server_default=sa.func.now()
+        )
+        batch_op.alter_column(
+            "updated_at", existing_type=sa.DateTime(), server_default=sa.func.now()
+        )
+
+    op.create_table(
+        "orders_archive",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("buyer_id", sa.String(), nullable=True),
+        sa.Column("seller_id", sa.String(), nullable=True),
+        sa.Column(
+            "status",
+            # the type already exists, it was created with the orders table
+            postgresql.ENUM(
+                "PENDING",
+                "CONFIRMED",
+                "READY",
+                "DONE",
+                "CANCELLED",
+                "AUTO_CANCELLED",
+                name="orderstatus",
+                create_type=False,
+            ),
+            nullable=True,
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("item_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["buyer_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["seller_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_orders_archive_seller_id_created_at",
+        "orders_archive",
+        ["seller_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_orders_archive_buyer_id_created_at",
+        "orders_archive",
+        ["buyer_id", "created_at", "id"],
+    )
+
+    op.create_table(
+        "order_items_archive",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("order_id", sa.String(), nullable=False),
+        sa.Column("seller_inventory_id", sa.String(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("price_at_purchase", sa.Integer(), nullable=False),
+        sa.Column("product_name", sa.String(), nullable=True),
+        sa.Column("product_image", sa.String(), nullable=True),
+        sa.Column("product_description", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["order_id"], ["orders_archive.id"]),
+        sa.ForeignKeyConstraint(["seller_inventory_id"], ["seller_inventory.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_order_items_archive_order_id", "order_items_archive", ["order_id"]
+    )
+    op.create_index(
+        "ix_order_items_archive_seller_inventory_id",
+        "order_items_archive",
+        ["seller_inventory_id"],
+    )
+
+
+def downgrade() -> None:
+    # put archived orders back before dropping the archive
+    op.execute(
+        "INSERT INTO orders"
+        " (id, buyer_id, seller_id, status, created_at, updated_at, total, item_count)"
+        " SELECT id, buyer_id, seller_id, status, created_at, updated_at, total, item_count"
+        " FROM orders_archive"
+    )
+    op.execute(
+        "INSERT INTO order_items"
+        " (id, order_id, seller_inventory_id, quantity, price_at_purchase,"
+        " product_name, product_image, product_description)"
+        " SELECT id, order_id, seller_inventory_id, quantity, price_at_purchase,"
+        " product_name, product_image, product_description"
+        " FROM order_items_archive"
+    )
+    op.drop_table("order_items_archive")
+    op.drop_table("orders_archive")
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.alter_column(
+            "updated_at", existing_type=sa.DateTime(), server_default=None
+        )
+        batch_op.alter_column(
+            "created_at", existing_type=sa.DateTime(), server_default=None
+        )
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.core import config
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded in-process cache with per-entry expiry.
+    Features:
+    - Entries expire after `ttl` seconds (or a custom ttl passed to `set`).
+    - When full, the least recently used entry is evicted.
+    - Keeps hit/miss/eviction counters, exposed through `stats()`.
+    Args:
+        max_size (int): The maximum number of entries kept in memory.
+        ttl (float): The default time to live of an entry, in seconds.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# verified JWT payloads keyed by token hash, each expiring at the token's `exp`
+token_cache = TTLCache(
+    config.TOKEN_CACHE_MAX_SIZE, config.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+# users that wrote recently and must read from the primary (read your writes)
+recent_writers = TTLCache(10000, config.READ_YOUR_WRITES_SECONDS)
+
+# totals of paginated listings keyed by the compiled count query and its parameters
+count_cache = TTLCache(10000, config.PAGINATION_COUNT_CACHE_TTL)
+
+# stored responses of completed idempotent requests keyed by (user id, Idempotency-Key)
+idempotency_cache = TTLCache(
+    config.IDEMPOTENCY_CACHE_MAX_SIZE, config.IDEMPOTENCY_TTL_SECONDS
+)
@@ -4,3 +4,74 @@ SECRET_KEY = env.get("SECRET_KEY", "your_secret_key")
 ALGORITHM = env.get("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = float(env.get("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 DATABASE_URL = env.get("DATABASE_URL")
+
+
+def _async_url(url: str | None) -> str | None:
+    if not url:
+        return url
+    drivers = {
+        "postgres://": "postgresql+asyncpg://",
+        "postgresql://": "postgresql+asyncpg://",
+        "postgresql+psycopg2://": "postgresql+asyncpg://",
+        "sqlite://": "sqlite+aiosqlite://",
+    }
+    for prefix, async_prefix in drivers.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+ASYNC_DATABASE_URL = env.get("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+READ_REPLICA_URL = env.get("READ_REPLICA_URL")
+ASYNC_READ_REPLICA_URL = env.get("ASYNC_READ_REPLICA_URL") or _async_url(READ_REPLICA_URL)
+READ_YOUR_WRITES_SECONDS = float(env.get("READ_YOUR_WRITES_SECONDS", 5))
+DB_POOL_SIZE = int(env.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(env.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_RECYCLE = int(env.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_TIMEOUT = float(env.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_PRE_PING = env.get("DB_POOL_PRE_PING", "true").lower() == "true"
+
+TOKEN_CACHE_MAX_SIZE = int(env.get("TOKEN_CACHE_MAX_SIZE", 10000))
+PASSWORD_HASH_WORKERS = int(env.get("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_MAX_CONCURRENCY = int(env.get("PASSWORD_HASH_MAX_CONCURRENCY", 4))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(env.get("PASSWORD_HASH_QUEUE_TIMEOUT", 5))
+REVOCATION_REFRESH_SECONDS = float(env.get("REVOCATION_REFRESH_SECONDS", 5))
+
+PAGINATION_COUNT_STRATEGY = env.get("PAGINATION_COUNT_STRATEGY", "window")
+PAGINATION_COUNT_CAP = int(env.get("PAGINATION_COUNT_CAP", 10000))
+PAGINATION_COUNT_CACHE_TTL = float(env.get("PAGINATION_COUNT_CACHE_TTL", 30))
+
+CART_RESERVATION_ENABLED = env.get("CART_RESERVATION_ENABLED", "false").lower() == "true"
+CART_RESERVATION_SECONDS = int(env.get("CART_RESERVATION_SECONDS", 900))
+RESERVATION_SWEEP_SECONDS = float(env.get("RESERVATION_SWEEP_SECONDS", 30))
+RESERVATION_SWEEP_BATCH = int(env.get("RESERVATION_SWEEP_BATCH", 5000))
+
+IDEMPOTENCY_TTL_SECONDS = int(env.get("IDEMPOTENCY_TTL_SECONDS", 86400))
+IDEMPOTENCY_CACHE_MAX_SIZE = int(env.get("IDEMPOTENCY_CACHE_MAX_SIZE", 10000))
+
+CHECKOUT_GROUP_COMMIT_ENABLED = env.get("CHECKOUT_GROUP_COMMIT_ENABLED", "false").lower() == "true"
+CHECKOUT_GROUP_SHARDS = int(env.get("CHECKOUT_GROUP_SHARDS", 8))
+CHECKOUT_GROUP_MAX_BATCH = int(env.get("CHECKOUT_GROUP_MAX_BATCH", 200))
+CHECKOUT_GROUP_TIMEOUT_SECONDS = float(env.get("CHECKOUT_GROUP_TIMEOUT_SECONDS", 30))
+
+STOCK_MAX_SHARDS = int(env.get("STOCK_MAX_SHARDS", 32))
+
+AUTO_CANCEL_AFTER_HOURS = float(env.get("AUTO_CANCEL_AFTER_HOURS", 24))
+AUTO_CANCEL_BATCH = int(env.get("AUTO_CANCEL_BATCH", 1000))
+AUTO_CANCEL_INTERVAL_SECONDS = float(env.get("AUTO_CANCEL_INTERVAL_SECONDS", 60))
+
+JOB_WORKER_IN_WEB = env.get("JOB_WORKER_IN_WEB", "true").lower() == "true"
+JOB_POLL_SECONDS = float(env.get("JOB_POLL_SECONDS", 1))
+JOB_BATCH_SIZE = int(env.get("JOB_BATCH_SIZE", 10))
+JOB_MAX_ATTEMPTS = int(env.get("JOB_MAX_ATTEMPTS", 5))
+JOB_RETRY_BASE_SECONDS = float(env.get("JOB_RETRY_BASE_SECONDS", 10))
+JOB_RETRY_MAX_SECONDS = float(env.get("JOB_RETRY_MAX_SECONDS", 3600))
+JOB_LOCK_TIMEOUT_SECONDS = float(env.get("JOB_LOCK_TIMEOUT_SECONDS", 600))
+JOB_RETENTION_HOURS = float(env.get("JOB_RETENTION_HOURS", 168))
+
+ORDER_ARCHIVE_AFTER_DAYS = float(env.get("ORDER_ARCHIVE_AFTER_DAYS", 30))
+ORDER_ARCHIVE_BATCH = int(env.get("ORDER_ARCHIVE_BATCH", 1000))
+ORDER_ARCHIVE_INTERVAL_SECONDS = float(env.get("ORDER_ARCHIVE_INTERVAL_SECONDS", 3600))
+
+ORDER_BULK_MAX_IDS = int(env.get("ORDER_BULK_MAX_IDS", 500))
+CART_BULK_MAX_ITEMS = int(env.get("CART_BULK_MAX_ITEMS", 100))
@@ -1,6 +1,6 @@
 from functools import wraps
 from fastapi import Request
-from requests import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exception import FORBIDDEN
 from app.models.user import User
@@ -19,12 +19,15 @@ def require_roles(*roles: str):
 
 def transactional(fn):
     @wraps(fn)
-    def wrapper(self, *args, **kwargs):
-        db: Session = self.db
+    async def wrapper(self, *args, **kwargs):
+        db: AsyncSession = self.db
+        db.info["use_primary"] = True
+        db.info["wrote"] = True
         try:
-            with db.begin():
-                return fn(self, *args, **kwargs)
+            result = await fn(self, *args, **kwargs)
+            await db.commit()
+            return result
         except Exception:
-            db.rollback()
+            await db.rollback()
             raise
-    return wrapper
\ No newline at end of file
+    return wrapper
@@ -18,6 +18,17 @@ UNAUTHORIZED = HTTPException(
 FORBIDDEN = HTTPException(
     detail="Unauthorized", status_code=status.HTTP_403_FORBIDDEN
 )
+SERVICE_BUSY = HTTPException(
+    detail="Server busy, please retry", status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+)
+IDEMPOTENCY_IN_PROGRESS = HTTPException(
+    detail="A request with this Idempotency-Key is still in progress",
+    status_code=status.HTTP_409_CONFLICT,
+)
+IDEMPOTENCY_KEY_REUSED = HTTPException(
+    detail="Idempotency-Key was already used for a different request",
+    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+)
 
 
 # handlers
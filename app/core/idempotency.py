@@ -0,0 +1,145 @@
+import asyncio
+from typing import Callable, Coroutine
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy.exc import IntegrityError
+
+from app.core.cache import TTLCache, idempotency_cache
+from app.core.exception import IDEMPOTENCY_IN_PROGRESS, IDEMPOTENCY_KEY_REUSED
+from app.models.idempotency import IdempotencyKey
+from app.repository.idempotency_repository import IdempotencyKeyRepository
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotency-Replayed"
+
+Handler = Callable[[Request], Coroutine[None, None, Response]]
+
+
+class IdempotencyGuard:
+    """
+    Runs each (user, Idempotency-Key) pair at most once and replays its stored response afterwards.
+    Features:
+    - Completed responses are kept in the idempotency_keys table and fronted by an in-process cache,
+      a replay never reaches the handler (and never touches inventory).
+    - A duplicate arriving while the first attempt runs in this process waits for it instead of running.
+    - The key is claimed with an INSERT in the request transaction before the handler runs: a duplicate in
+      another process blocks on the unique key until the first attempt commits, then replays its response.
+      The claim commits or rolls back together with the handler's own writes, so failed attempts can be retried.
+    - The stored response is committed before the response is returned, a retry sent right after the
+      response (to any process) replays it instead of finding the key still in progress.
+    - A key reused for a different method or path is rejected.
+    - Only buffered responses are stored, a streamed or file response releases the key instead (a retry runs again).
+    Args:
+        cache (TTLCache): The in-process cache of completed responses.
+    """
+
+    def __init__(self, cache: TTLCache):
+        self.cache = cache
+        self._in_flight: dict[tuple[str, str], asyncio.Future] = {}
+
+    async def run(self, request: Request, user_id: str, key: str, handler: Handler) -> Response:
+        fingerprint = f"{request.method} {request.url.path}"
+        cache_key = (user_id, key)
+        while True:
+            stored = self.cache.get(cache_key)
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+            waiter = self._in_flight.get(cache_key)
+            if waiter is None:
+                break
+            await asyncio.shield(waiter)
+
+        self._in_flight[cache_key] = asyncio.get_running_loop().create_future()
+        try:
+            return await self._execute(request, user_id, key, fingerprint, handler)
+        finally:
+            self._in_flight.pop(cache_key).set_result(None)
+
+    async def _execute(
+        self, request: Request, user_id: str, key: str, fingerprint: str, handler: Handler
+    ) -> Response:
+        request_session = request.state.request_session
+        request_session.use_primary()
+        db = request_session.db
+        db.info["wrote"] = True
+        repo = IdempotencyKeyRepository(db)
+
+        record = await repo.get(user_id, key)
+        if record is None:
+            record = repo.save(IdempotencyKey(user_id=user_id, key=key, request=fingerprint))
+            try:
+                await db.flush()
+            except IntegrityError:
+                await db.rollback()
+                record = await repo.get(user_id, key)
+            else:
+                return await self._handle(request, record, handler)
+        return self._replay(self._stored(record), fingerprint)
+
+    async def _handle(self, request: Request, record: IdempotencyKey, handler: Handler) -> Response:
+        db = request.state.request_session.db
+        try:
+            response = await handler(request)
+        except Exception:
+            await db.rollback()
+            raise
+        if response.status_code >= 500:
+            await db.rollback()
+            return response
+
+        # the handler's own transaction may have committed already, commit the response now rather than
+        # after it has been sent, a failure here fails the request instead of losing the replay
+        repo = IdempotencyKeyRepository(db)
+        body = getattr(response, "body", None)
+        if body is None:
+            await repo.delete(record)
+            await db.commit()
+            return response
+        record.status_code = response.status_code
+        record.response_body = body.decode()
+        record.media_type = response.media_type
+        await db.commit()
+        self.cache.set((record.user_id, record.key), self._stored(record))
+        return response
+
+    def _stored(self, record: IdempotencyKey | None) -> tuple:
+        # a committed claim without a response belongs to an attempt that is still finishing
+        if record is None or record.status_code is None:
+            raise IDEMPOTENCY_IN_PROGRESS
+        return record.request, record.status_code, record.response_body, record.media_type
+
+    def _replay(self, stored: tuple, fingerprint: str) -> Response:
+        request, status_code, body, media_type = stored
+        if request != fingerprint:
+            raise IDEMPOTENCY_KEY_REUSED
+        return Response(
+            content=body,
+            status_code=status_code,
+            media_type=media_type,
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+
+idempotency = IdempotencyGuard(idempotency_cache)
+
+
+class IdempotentRoute(APIRoute):
+    """
+    Route class that makes the mutating endpoints of a router honour the Idempotency-Key header.
+    Routers opt in with `APIRouter(route_class=IdempotentRoute)`, requests without the header run as usual.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def get_route_handler(self) -> Handler:
+        handler = super().get_route_handler()
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            user = getattr(request.state, "user", None)
+            if not key or user is None or request.method in self.SAFE_METHODS:
+                return await handler(request)
+            return await idempotency.run(request, user.id, key, handler)
+
+        return idempotent_handler
@@ -1,39 +1,87 @@
-from fastapi import Request
-from app.database.session import get_db_session
-from app.core.exception import UNAUTHORIZED
-from app.repository.user_repository import UserRepository
+from fastapi import HTTPException, Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.cache import recent_writers
+from app.core.exception import UNAUTHORIZED, http_exception_handler
+from app.core.revocation import revocations
+from app.database.session import RequestSession
 from app.schemas.user import UserToken
 from app.utils import util
-from starlette.middleware.base import BaseHTTPMiddleware
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
+class AuthMiddleware:
     """
-    AuthMiddleware is a custom middleware for FastAPI applications that enforces authentication and role-based authorization on secured endpoints.
+    AuthMiddleware is a pure ASGI middleware for FastAPI applications that enforces authentication and role-based authorization on secured endpoints.
     Features:
-    - Checks if the request path starts with "/secured" to apply authentication.
+    - Passes every non-HTTP, OPTIONS and non "/secured" request straight through to the app.
     - Validates the presence and format of the Authorization header (expects a Bearer token).
-    - Verifies the JWT token and extracts the user ID.
-    - Retrieves the user from the database and attaches it to the request state.
-    - Checks required roles for the endpoint or router, ensuring the user has appropriate permissions.
-    - Raises UnauthorizedUserException for any authentication or authorization failure.
+    - Verifies the JWT token (verified payloads are cached until they expire) and extracts the user ID, role and token version.
+    - Rejects tokens revoked by a password change or account deletion, using the in-memory revocation table
+      (refreshed from the primary through the request session opened by DBSessionMiddleware).
+    - Builds the user from the token claims alone and attaches it to the request state.
+    - Pins the request session to the primary database right after the user's own writes (read your writes),
+      the request session remembers the user once its write commits.
+    - Answers any authentication failure with the global exception handler response.
     Args:
-        request (Request): The incoming HTTP request.
-        call_next (Callable): The next middleware or endpoint handler.
-    Raises:
-        UnauthorizedUserException: If authentication or authorization fails.
+        app (ASGIApp): The next ASGI application in the stack.
     """
 
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
-
-        if request.method != "OPTIONS" and path.startswith("/secured"):
-            user_id = util.get_user_from_token(request.headers.get("Authorization"))
-            if not user_id:
-                raise UNAUTHORIZED
-            with get_db_session() as db:
-                user = UserRepository(db).find_by_id(user_id)
-                if not user:
-                    raise UNAUTHORIZED
-                request.state.user = UserToken(**user.__dict__)
-        return await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or not scope["path"].startswith("/secured")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        try:
+            request.state.user = await self.authenticate(request)
+        except HTTPException as exc:
+            response = await http_exception_handler(request, exc)
+            await response(scope, receive, send)
+            return
+        request.state.request_session.set_user(request.state.user.id)
+        if recent_writers.get(request.state.user.id):
+            request.state.request_session.use_primary()
+        await self.app(scope, receive, send)
+
+    async def authenticate(self, request: Request) -> UserToken:
+        claims = util.get_claims_from_token(request.headers.get("Authorization"))
+        if not claims or not claims.get("user_id") or not claims.get("role"):
+            raise UNAUTHORIZED
+        await revocations.refresh_if_stale(request.state.request_session)
+        if revocations.is_revoked(claims["user_id"], claims.get("ver", 0)):
+            raise UNAUTHORIZED
+        return UserToken(id=claims["user_id"], role=claims["role"])
+
+
+class DBSessionMiddleware:
+    """
+    DBSessionMiddleware gives every HTTP request one lazily created database session.
+    Features:
+    - Stores a RequestSession on the request state, shared by AuthMiddleware and the `get_db` dependency.
+    - Never commits: writes commit in their own @transactional service call before the response is built,
+      whatever is left open when the request ends is only reads and is rolled back.
+    - Closes the session (returning its connection to the pool) once the response has been sent.
+    Args:
+        app (ASGIApp): The next ASGI application in the stack.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_session = RequestSession()
+        scope.setdefault("state", {})["request_session"] = request_session
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await request_session.close()
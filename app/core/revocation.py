@@ -0,0 +1,102 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import config
+from app.database.session import RequestSession, RoutingSession
+from app.repository.user_repository import UserRepository
+
+DELETED = -1
+
+# session.info key of the revocations waiting for their transaction to commit
+PENDING_KEY = "revocations"
+
+# rows whose transaction committed after a refresh may carry an older updated_at
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+
+class TokenRevocationTable:
+    """
+    In-memory table of the current token version of every user whose tokens were revoked.
+    Features:
+    - Only users with a bumped token version or a deleted account are kept, everyone else is implicitly valid.
+    - The first refresh loads the whole table, later refreshes only read users updated since the last one.
+    - Changes made by this process are applied through `mark`/`mark_deleted` as soon as their transaction
+      commits, a rolled back change revokes nothing.
+    - Refreshes read the primary, a lagging replica could miss a revocation that is older than the overlap.
+    Args:
+        refresh_interval (float): How often the table is refreshed from the users table, in seconds.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._versions: dict[str, int] = {}
+        self._watermark: datetime | None = None
+        self._loaded = False
+        self._refreshed_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def is_revoked(self, user_id: str, version: int) -> bool:
+        current = self._versions.get(user_id)
+        return current is not None and current != version
+
+    def mark(self, db: AsyncSession, user_id: str, version: int) -> None:
+        db.info.setdefault(PENDING_KEY, {})[user_id] = version
+
+    def mark_deleted(self, db: AsyncSession, user_id: str) -> None:
+        self.mark(db, user_id, DELETED)
+
+    def apply(self, marks: dict[str, int]) -> None:
+        """Applies committed marks, the new token version (or DELETED) by user id."""
+        self._versions.update(marks)
+
+    async def refresh_if_stale(self, request_session: RequestSession) -> None:
+        if time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+        if self._loaded and self._lock.locked():
+            return
+        async with self._lock:
+            if time.monotonic() - self._refreshed_at < self.refresh_interval:
+                return
+            request_session.use_primary()
+            await self.refresh(UserRepository(request_session.db))
+
+    async def refresh(self, repo: UserRepository) -> None:
+        since = self._watermark - REFRESH_OVERLAP if self._watermark else None
+        if not self._loaded:
+            since = None
+            self._watermark = await repo.find_last_updated_at()
+
+        for user_id, token_version, deleted, updated_at in await repo.find_token_states(since):
+            if deleted:
+                self._versions[user_id] = DELETED
+            elif token_version:
+                self._versions[user_id] = token_version
+            if updated_at and (self._watermark is None or updated_at > self._watermark):
+                self._watermark = updated_at
+
+        self._loaded = True
+        self._refreshed_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._versions),
+            "watermark": self._watermark,
+            "refresh_interval": self.refresh_interval,
+        }
+
+
+revocations = TokenRevocationTable(config.REVOCATION_REFRESH_SECONDS)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def apply_pending_revocations(session):
+    revocations.apply(session.info.pop(PENDING_KEY, {}))
+
+
+@event.listens_for(RoutingSession, "after_soft_rollback")
+def discard_pending_revocations(session, previous_transaction):
+    session.info.pop(PENDING_KEY, None)
@@ -1,13 +1,22 @@
 import pkgutil
 import importlib
 from pathlib import Path
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.sql import functions
 
 
 class Base(DeclarativeBase):
     pass
 
 
+@compiles(functions.now, "sqlite")
+def sqlite_now(element, compiler, **kw):
+    # CURRENT_TIMESTAMP stores whole seconds as "YYYY-MM-DD HH:MM:SS", SQLAlchemy binds datetimes with six
+    # fractional digits, render now() in the same format so server defaults compare and sort with bound values
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
 # Auto-import all modules in app/models
 models_path = Path(__file__).parent.parent / "models"
 for _, module_name, _ in pkgutil.iter_modules([str(models_path)]):
@@ -0,0 +1,16 @@
+import zlib
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def try_leader_lock(db: AsyncSession, name: str) -> bool:
+    """
+    Takes the PostgreSQL advisory lock `name` for the current transaction, without waiting.
+    Returns False while another session holds it, so only one worker runs the guarded job at a time.
+    Other databases (SQLite in development) serve a single process and always get the lock.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return True
+    key = zlib.crc32(name.encode())
+    return await db.scalar(select(func.pg_try_advisory_xact_lock(key)))
@@ -0,0 +1,105 @@
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# upper bounds of the checkout wait-time histogram buckets, in milliseconds
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolStats:
+    """
+    Counters and a checkout wait-time histogram for a connection pool.
+    Features:
+    - Counts connects, checkouts, checkins and invalidations, fed by pool events.
+    - Buckets the time spent waiting for a connection on every checkout.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        wait_ms = seconds * 1000
+        with self._lock:
+            self.wait_buckets[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def incr(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            observed = sum(self.wait_buckets)
+            histogram = {
+                f"le_{bound}ms": count
+                for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)
+            }
+            histogram["inf"] = self.wait_buckets[-1]
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "wait_ms": {
+                    "count": observed,
+                    "avg": self.wait_total_ms / observed if observed else 0.0,
+                    "max": self.wait_max_ms,
+                    "histogram": histogram,
+                },
+            }
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waits for a connection, and keeps its max overflow."""
+
+    stats: PoolStats
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        self.max_overflow = max_overflow
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.stats.observe_wait(time.perf_counter() - start)
+
+
+def instrumented_pool_class() -> type[InstrumentedAsyncPool]:
+    # the stats live on a per-engine subclass so they survive pool.recreate()
+    return type("InstrumentedAsyncPool", (InstrumentedAsyncPool,), {"stats": PoolStats()})
+
+
+def register_pool_events(engine: AsyncEngine) -> None:
+    pool = engine.sync_engine.pool
+    stats = pool.stats
+    event.listen(pool, "connect", lambda *_: stats.incr("connects"))
+    event.listen(pool, "checkout", lambda *_: stats.incr("checkouts"))
+    event.listen(pool, "checkin", lambda *_: stats.incr("checkins"))
+    event.listen(pool, "invalidate", lambda *_: stats.incr("invalidations"))
+
+
+def pool_status(engine: AsyncEngine) -> dict:
+    pool = engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool.max_overflow,
+        "timeout": pool.timeout(),
+        **pool.stats.snapshot(),
+    }
@@ -1,30 +1,130 @@
-from contextlib import contextmanager
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.core.config import DATABASE_URL
+from contextlib import asynccontextmanager
+from fastapi import Request
+from sqlalchemy import Select, event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session
+from app.core import config
+from app.core.cache import recent_writers
+from app.database.pool import instrumented_pool_class, register_pool_events
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, future=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _create_engine(url: str) -> AsyncEngine:
+    async_engine = create_async_engine(
+        url,
+        poolclass=instrumented_pool_class(),
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+    )
+    register_pool_events(async_engine)
+    return async_engine
 
-def get_db():
-    db = SessionLocal()
-    try:
+
+engine = _create_engine(config.ASYNC_DATABASE_URL)
+replica_engine = (
+    _create_engine(config.ASYNC_READ_REPLICA_URL)
+    if config.ASYNC_READ_REPLICA_URL
+    else None
+)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain reads to the read replica (when one is configured) and everything else to the primary.
+    A statement goes to the primary when:
+    - the session is pinned with `info["use_primary"]` (set by @transactional and the read-your-writes override),
+    - the session is flushing, or the statement is not a SELECT,
+    - the SELECT locks rows (FOR UPDATE).
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            replica_engine is None
+            or self._flushing
+            or self.info.get("use_primary")
+            or not isinstance(clause, Select)
+            or clause._for_update_arg is not None
+        ):
+            return engine.sync_engine
+        return replica_engine.sync_engine
+
+
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+class RequestSession:
+    """
+    The AsyncSession of a single request, shared by the middlewares and the route handler.
+    The session is only created on first use, so requests that never touch the
+    database never check out a connection.
+    """
+
+    def __init__(self):
+        self._db: AsyncSession | None = None
+        self._use_primary = False
+        self._user_id: str | None = None
+
+    @property
+    def db(self) -> AsyncSession:
+        if self._db is None:
+            self._db = SessionLocal(
+                info={"use_primary": self._use_primary, "user_id": self._user_id}
+            )
+        return self._db
+
+    def use_primary(self) -> None:
+        self._use_primary = True
+        if self._db is not None:
+            self._db.info["use_primary"] = True
+
+    def set_user(self, user_id: str) -> None:
+        """Records the authenticated user, whose reads go to the primary once this session commits a write."""
+        self._user_id = user_id
+        if self._db is not None:
+            self._db.info["user_id"] = user_id
+
+    async def close(self) -> None:
+        """Closes the session, a transaction still open (nothing but reads, writes commit themselves) is rolled back."""
+        if self._db is not None:
+            await self._db.close()
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def remember_writer(session):
+    # marked as soon as the write commits, before the response goes out (read your writes)
+    if session.info.get("wrote") and session.info.get("user_id"):
+        recent_writers.set(session.info["user_id"], True)
+
+
+async def get_db(request: Request):
+    request_session: RequestSession | None = getattr(request.state, "request_session", None)
+    if request_session is not None:
+        yield request_session.db
+        return
+
+    async with get_db_session() as db:
         yield db
-    finally:
-        if db.in_transaction():
-            db.commit()
-        db.close()
 
 
-@contextmanager
-def get_db_session():
-    db_gen = get_db()
-    db = next(db_gen)
+@asynccontextmanager
+async def get_db_session():
+    db = SessionLocal(info={"use_primary": True})
     try:
         yield db
+        if db.in_transaction():
+            await db.commit()
     finally:
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
\ No newline at end of file
+        await db.close()
@@ -2,21 +2,31 @@ import os
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.middleware import AuthMiddleware
-from app.database.base import Base
-from app.database.session import engine
+from app.core import config
+from app.core.middleware import AuthMiddleware, DBSessionMiddleware
+from app.database.session import engine, replica_engine
 from app.core.exception import http_exception_handler
-from app.routers import admin, auth, cart, order, product, seller_inventory
-from app.task.auto_cancel import start_scheduler
+from app.routers import admin, auth, cart, internal, order, product, seller_inventory
+from app.services.checkout_pipeline import checkout_pipeline
+from app.services.password_service import password_service
+from app.task.worker import job_worker
 
-# --- Create DB tables ---
-Base.metadata.create_all(bind=engine)
 
 # --- FastAPI app ---
+# (the schema is managed by the Alembic migrations, run `alembic upgrade head` before starting)
 app = FastAPI()
 
-# --- Scheduled tasks ---
-app.on_event("startup")(start_scheduler)
+# --- Background jobs ---
+# (production runs them in a separate `python -m app.worker` process with JOB_WORKER_IN_WEB=false)
+if config.JOB_WORKER_IN_WEB:
+    app.on_event("startup")(job_worker.start)
+    app.on_event("shutdown")(job_worker.stop)
+
+app.on_event("shutdown")(engine.dispose)
+if replica_engine is not None:
+    app.on_event("shutdown")(replica_engine.dispose)
+app.on_event("shutdown")(password_service.shutdown)
+app.on_event("shutdown")(checkout_pipeline.shutdown)
 
 # --- Custom global exception handler with CORS headers ---
 app.add_exception_handler(Exception, http_exception_handler)
@@ -31,6 +41,7 @@ app.add_middleware(
 )
 
 app.add_middleware(AuthMiddleware)
+app.add_middleware(DBSessionMiddleware)
 
 # --- Routers ---
 app.include_router(auth.router)
@@ -39,6 +50,7 @@ app.include_router(product.router)
 app.include_router(seller_inventory.router)
 app.include_router(cart.router)
 app.include_router(order.router)
+app.include_router(internal.router)
 
 # --- Static files ---
 static_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
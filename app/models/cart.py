@@ -1,5 +1,5 @@
 from uuid import uuid4
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Integer, String, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.database.base import Base
@@ -9,8 +9,15 @@ class CartItem(Base):
     __tablename__ = "cart"
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
     buyer_id = Column(String, ForeignKey("users.id"))
-    seller_inventory_id = Column(String, ForeignKey("seller_inventory.id"))
+    seller_inventory_id = Column(String, ForeignKey("seller_inventory.id"), index=True)
     quantity = Column(Integer, nullable=False)
 
     buyer = relationship("User", back_populates="cart_items")
     seller_inventory = relationship("SellerInventory", back_populates="cart_items")
+
+    # one line per inventory in a cart, also serves the lookups by buyer_id
+    __table_args__ = (
+        UniqueConstraint(
+            "buyer_id", "seller_inventory_id", name="uq_cart_buyer_id_seller_inventory_id"
+        ),
+    )
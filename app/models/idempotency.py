@@ -0,0 +1,14 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, func
+
+from app.database.base import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    key = Column(String, primary_key=True)
+    request = Column(String, nullable=False)
+    status_code = Column(Integer)
+    response_body = Column(Text)
+    media_type = Column(String)
+    created_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
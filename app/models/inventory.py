@@ -1,5 +1,15 @@
 from uuid import uuid4
-from sqlalchemy import Boolean, Column, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    false,
+)
 from sqlalchemy.orm import relationship
 
 from app.database.base import Base
@@ -9,11 +19,37 @@ class SellerInventory(Base):
     __tablename__ = "seller_inventory"
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
     seller_id = Column(String, ForeignKey("users.id"))
-    product_id = Column(String, ForeignKey("products.id"))
+    product_id = Column(String, ForeignKey("products.id"), index=True)
     price = Column(Float, nullable=False)
+    # the stock of shard 0, the other shards live in seller_inventory_shards
     quantity = Column(Integer, nullable=False)
+    shard_count = Column(Integer, nullable=False, default=1, server_default="1")
     delete = Column(Boolean, default=False)
-    
+
     seller = relationship("User", back_populates="inventories")
     product = relationship("Product", back_populates="inventory")
     cart_items = relationship("CartItem", back_populates="seller_inventory")
+
+    # one inventory per seller and product, also serves the lookups by seller_id
+    __table_args__ = (
+        UniqueConstraint(
+            "seller_id", "product_id", name="uq_seller_inventory_seller_id_product_id"
+        ),
+        Index(
+            "ix_seller_inventory_price_active",
+            "price",
+            "id",
+            postgresql_where=delete == false(),
+            sqlite_where=delete == false(),
+        ),
+        Index("ix_seller_inventory_seller_id_price", "seller_id", "price", "id"),
+        Index("ix_seller_inventory_seller_id_quantity", "seller_id", "quantity", "id"),
+    )
+
+
+# stock sub-counters 1..shard_count-1 of a sharded inventory, shard 0 is SellerInventory.quantity
+class SellerInventoryShard(Base):
+    __tablename__ = "seller_inventory_shards"
+    seller_inventory_id = Column(String, ForeignKey("seller_inventory.id"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    quantity = Column(Integer, nullable=False)
@@ -0,0 +1,26 @@
+from datetime import datetime
+from uuid import uuid4
+from sqlalchemy import JSON, Column, DateTime, Enum, Index, Integer, String, Text
+
+from app.database.base import Base
+from app.utils.enums import JobStatus
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    name = Column(String, nullable=False)
+    payload = Column(JSON)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime, nullable=False)
+    locked_at = Column(DateTime)
+    last_error = Column(Text)
+    # set while a periodic job is queued or running, so only one occurrence is ever outstanding
+    dedupe_key = Column(String, unique=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    finished_at = Column(DateTime)
+
+    # the worker's claim scan of due jobs
+    __table_args__ = (Index("ix_jobs_status_run_at", "status", "run_at"),)
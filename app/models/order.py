@@ -1,7 +1,6 @@
-from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from app.database.base import Base
@@ -13,24 +12,72 @@ class Order(Base):
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
     buyer_id = Column(String, ForeignKey("users.id"))
     seller_id = Column(String, ForeignKey("users.id"))
-    status = Column(Enum(OrderStatus), default=OrderStatus.PENDING)
-    created_at = Column(DateTime, default=datetime.now())
-    updated_at = Column(DateTime, default=datetime.now(), onupdate=datetime.now())
+    status = Column(Enum(OrderStatus), default=OrderStatus.PENDING, index=True)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # written once at checkout, so listings never aggregate order_items
+    total = Column(Float, nullable=False, default=0, server_default="0")
+    item_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     buyer = relationship("User", foreign_keys=[buyer_id])
     seller = relationship("User", foreign_keys=[seller_id])
     items = relationship("OrderItem", back_populates="order") 
 
+    # back the seller/buyer order listings, sorted by date with id as tie-breaker
+    __table_args__ = (
+        Index("ix_orders_seller_id_created_at", "seller_id", "created_at", "id"),
+        Index("ix_orders_buyer_id_created_at", "buyer_id", "created_at", "id"),
+        # the auto-cancel scan of stale PENDING orders
+        Index("ix_orders_status_created_at", "status", "created_at"),
+    )
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
-    order_id = Column(String, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(String, ForeignKey("orders.id"), nullable=False, index=True)
     seller_inventory_id = Column(
-        String, ForeignKey("seller_inventory.id"), nullable=False
+        String, ForeignKey("seller_inventory.id"), nullable=False, index=True
     )
     quantity = Column(Integer, nullable=False)
     price_at_purchase = Column(Integer, nullable=False)
+    # the product as it was at checkout
+    product_name = Column(String)
+    product_image = Column(String)
+    product_description = Column(String)
 
     order = relationship("Order", back_populates="items")
     seller_inventory = relationship("SellerInventory")
+
+
+# finished orders moved out of `orders` by the archive job, so active-order queries only scan the hot set
+class OrderArchive(Base):
+    __tablename__ = "orders_archive"
+    id = Column(String, primary_key=True)
+    buyer_id = Column(String, ForeignKey("users.id"))
+    seller_id = Column(String, ForeignKey("users.id"))
+    status = Column(Enum(OrderStatus))
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    total = Column(Float, nullable=False)
+    item_count = Column(Integer, nullable=False)
+
+    # back the order history listings, sorted by date with id as tie-breaker
+    __table_args__ = (
+        Index("ix_orders_archive_seller_id_created_at", "seller_id", "created_at", "id"),
+        Index("ix_orders_archive_buyer_id_created_at", "buyer_id", "created_at", "id"),
+    )
+
+
+class OrderItemArchive(Base):
+    __tablename__ = "order_items_archive"
+    id = Column(String, primary_key=True)
+    order_id = Column(String, ForeignKey("orders_archive.id"), nullable=False, index=True)
+    seller_inventory_id = Column(
+        String, ForeignKey("seller_inventory.id"), nullable=False, index=True
+    )
+    quantity = Column(Integer, nullable=False)
+    price_at_purchase = Column(Integer, nullable=False)
+    product_name = Column(String)
+    product_image = Column(String)
+    product_description = Column(String)
@@ -1,5 +1,5 @@
 from uuid import uuid4
-from sqlalchemy import Boolean, Column, String
+from sqlalchemy import Boolean, Column, Index, String, false
 from sqlalchemy.orm import relationship
 
 from app.database.base import Base
@@ -15,3 +15,13 @@ class Product(Base):
     delete = Column(Boolean, default=False)
 
     inventory = relationship("SellerInventory", back_populates="product")
+
+    __table_args__ = (
+        Index(
+            "ix_products_name_active",
+            "name",
+            "id",
+            postgresql_where=delete == false(),
+            sqlite_where=delete == false(),
+        ),
+    )
@@ -0,0 +1,24 @@
+from uuid import uuid4
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+
+from app.database.base import Base
+
+
+class StockReservation(Base):
+    __tablename__ = "stock_reservations"
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
+    buyer_id = Column(String, ForeignKey("users.id"), nullable=False)
+    seller_inventory_id = Column(
+        String, ForeignKey("seller_inventory.id"), nullable=False, index=True
+    )
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    # one hold per cart line, also serves the lookups by buyer_id
+    __table_args__ = (
+        UniqueConstraint(
+            "buyer_id",
+            "seller_inventory_id",
+            name="uq_stock_reservations_buyer_id_seller_inventory_id",
+        ),
+    )
@@ -1,6 +1,6 @@
 from uuid import uuid4
 
-from sqlalchemy import Column, Enum, String, Boolean
+from sqlalchemy import Column, DateTime, Enum, Index, Integer, String, Boolean, false, func
 from sqlalchemy.orm import relationship
 
 from app.database.base import Base
@@ -17,6 +17,25 @@ class User(Base):
     password = Column(String)
     role = Column(Enum(RoleEnum), default=RoleEnum.BUYER)
     delete = Column(Boolean, default=False)
+    token_version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     inventories = relationship("SellerInventory", back_populates="seller")
     cart_items = relationship("CartItem", back_populates="buyer")
+
+    __table_args__ = (
+        Index(
+            "ix_users_username_active",
+            "username",
+            "id",
+            postgresql_where=delete == false(),
+            sqlite_where=delete == false(),
+        ),
+        Index(
+            "ix_users_name_active",
+            "name",
+            "id",
+            postgresql_where=delete == false(),
+            sqlite_where=delete == false(),
+        ),
+    )
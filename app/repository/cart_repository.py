@@ -1,20 +1,23 @@
 from app.models.cart import CartItem
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.inventory import SellerInventory
+from app.models.reservation import StockReservation
 
 from app.models.product import Product
 from app.models.user import User
+from app.repository.common import upsert_insert
 
 
 class CartRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.model = CartItem
 
-    def find_all(self, buyer_id: str):
-        return (
-            self.db.query(
+    async def find_all(self, buyer_id: str):
+        query = (
+            select(
                 CartItem.id,
                 CartItem.quantity,
                 SellerInventory.id.label("inventory_id"),
@@ -22,35 +25,64 @@ class CartRepository:
                 Product.id.label("product_id"),
                 Product.name.label("product_name"),
                 Product.image,
+                Product.description.label("product_description"),
                 User.id.label("seller_id"),
                 User.name.label("seller_name"),
+                StockReservation.expires_at.label("reserved_until"),
             )
             .join(CartItem.seller_inventory)
             .join(SellerInventory.product)
             .join(SellerInventory.seller)
-            .filter(self.model.buyer_id == buyer_id)
-            .all()
+            .outerjoin(
+                StockReservation,
+                (StockReservation.buyer_id == CartItem.buyer_id)
+                & (StockReservation.seller_inventory_id == CartItem.seller_inventory_id),
+            )
+            .where(self.model.buyer_id == buyer_id)
         )
+        return (await self.db.execute(query)).all()
 
-    def get_by_id(self, cart_id):
-        return self.db.query(self.model).filter_by(id=cart_id).first()
+    async def get_by_id(self, cart_id):
+        return await self.db.scalar(select(self.model).filter_by(id=cart_id))
 
-    def get_by_buyer_id_and_inventory_id(self, buyer_id, inventory_id):
-        return (
-            self.db.query(self.model)
-            .filter_by(buyer_id=buyer_id, seller_inventory_id=inventory_id)
-            .first()
+    async def add_items(self, buyer_id: str, quantities: dict[str, int]) -> dict[str, int]:
+        """
+        Adds `quantities[inventory_id]` to the buyer's cart lines with one INSERT ... ON CONFLICT DO UPDATE,
+        creating the lines that do not exist yet.
+        Returns:
+            dict[str, int]: The new quantity of every line, by inventory id.
+        """
+        query = upsert_insert(self.db, self.model).values(
+            [
+                {"buyer_id": buyer_id, "seller_inventory_id": inventory_id, "quantity": quantity}
+                for inventory_id, quantity in quantities.items()
+            ]
         )
-
-    def create_cart(self, cart: CartItem):
-        self.db.add(cart)
-        return cart
+        query = query.on_conflict_do_update(
+            index_elements=[self.model.buyer_id, self.model.seller_inventory_id],
+            set_={"quantity": self.model.quantity + query.excluded.quantity},
+        ).returning(self.model.seller_inventory_id, self.model.quantity)
+        return dict((await self.db.execute(query)).all())
 
     def update_cart(self, cart: CartItem):
         self.db.add(cart)
 
-    def delete_cart_item(self, cart_item: CartItem):
-        self.db.delete(cart_item)
+    async def delete_cart_item(self, cart_item: CartItem):
+        await self.db.delete(cart_item)
+
+    async def lock_by_ids(self, cart_ids: list[str]) -> dict[str, int]:
+        """Locks the cart lines that still exist and returns their quantity by id."""
+        result = await self.db.execute(
+            select(CartItem.id, CartItem.quantity)
+            .where(CartItem.id.in_(cart_ids))
+            .order_by(CartItem.id)
+            .with_for_update()
+        )
+        return dict(result.all())
+
+    async def delete_by_ids(self, cart_ids: list[str]) -> int:
+        result = await self.db.execute(delete(CartItem).where(CartItem.id.in_(cart_ids)))
+        return result.rowcount
 
-    def clear_cart(self, buyer_id: str):
-        self.db.query(CartItem).filter(CartItem.buyer_id == buyer_id).delete()
+    async def clear_cart(self, buyer_id: str):
+        await self.db.execute(delete(CartItem).where(CartItem.buyer_id == buyer_id))
@@ -1,29 +1,217 @@
-from sqlalchemy import asc, desc, text
-from sqlalchemy.orm import Query
+import base64
+import json
+from datetime import datetime, timedelta
 
+from typing import Mapping
+
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Select,
+    asc,
+    desc,
+    func,
+    literal,
+    select,
+    tuple_,
+    type_coerce,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import Label
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.core import config
+from app.core.cache import count_cache
+from app.core.exception import BusinessError
 from app.schemas.common import Page
+from app.utils.enums import CountStrategy, TotalKind
 
+# name of the `count(*) OVER ()` column added by the window count strategy
+TOTAL_COLUMN = "_total"
 
-def find_paginated(
-    query: Query, model: object, skip: int, limit: int, sort_by: str, order: str
+
+async def find_paginated(
+    db: AsyncSession,
+    query: Select,
+    sort_keys: Mapping[str, ColumnElement],
+    skip: int,
+    limit: int,
+    sort_by: str,
+    order: str,
+    cursor: str | None = None,
+    count_strategy: CountStrategy | None = None,
 ):
     """
     Retrieves a paginated and sorted set of records from the database.
+    Records are sorted by the column registered for `sort_by` in `sort_keys`, with the
+    `id` key as tie-breaker. Unknown sort keys are rejected before any statement runs. Pages are either read with
+    OFFSET (`skip`) or, when a `cursor` is given, with a keyset predicate that seeks
+    straight past the last record of the previous page.
+    How the total is computed depends on `count_strategy` (PAGINATION_COUNT_STRATEGY by default):
+    - exact: a separate COUNT over the whole query.
+    - window: a `count(*) OVER ()` column on the page query itself, no extra round trip.
+      The window makes the database read every matching record before the LIMIT, so cursor pages
+      use capped instead to keep their index seek.
+    - capped: a separate COUNT that stops at PAGINATION_COUNT_CAP records.
+    - cached: an exact COUNT reused for PAGINATION_COUNT_CACHE_TTL seconds per filter.
     Args:
-        query (Query): The SQLAlchemy query object to execute the database operation.
-        model (object): The SQLAlchemy model class used for sorting.
-        skip (int): The number of records to skip (for pagination).
+        db (AsyncSession): The session used to execute the statements.
+        query (Select): The SQLAlchemy select statement to paginate.
+        sort_keys (Mapping[str, ColumnElement]): The allowed sort keys, each mapped to the column it sorts by.
+            Keys must match the attribute names of the returned records and include "id".
+        skip (int): The number of records to skip (ignored when a cursor is given).
         limit (int): The maximum number of records to return.
-        sort_by (str): The name of the model attribute to sort by.
+        sort_by (str): The sort key to sort by.
         order (str): The sort order, either "asc" for ascending or "desc" for descending.
+        cursor (str | None): The `next_cursor` of the previous page.
+        count_strategy (CountStrategy | None): How to compute the total number of records.
     Returns:
-        Page: A Page object containing the paginated results and total count.
+        Page: A Page object containing the paginated results, total count (and its kind) and next cursor.
+    """
+    sort_column = sort_keys.get(sort_by)
+    if sort_column is None:
+        raise BusinessError(f"Invalid sort_by, expected one of: {', '.join(sort_keys)}")
+    id_column = sort_keys["id"]
+
+    strategy = CountStrategy(count_strategy or config.PAGINATION_COUNT_STRATEGY)
+    if strategy == CountStrategy.WINDOW and cursor is not None:
+        strategy = CountStrategy.CAPPED
+    entity_query = is_entity_query(query)
+    count_query = query
+    if strategy == CountStrategy.WINDOW:
+        query = query.add_columns(func.count().over().label(TOTAL_COLUMN))
+    else:
+        total, total_kind = await count_total(db, query, strategy)
+
+    if cursor is not None:
+        query = _apply_cursor(query, sort_column, id_column, order, cursor)
+        skip = 0
+
+    direction = asc if order == "asc" else desc
+    query = query.order_by(direction(sort_column))
+    if sort_column is not id_column:
+        query = query.order_by(direction(id_column))
+    query = query.offset(skip).limit(limit + 1)
+
+    result = await db.execute(query)
+    data = result.all()
+    if strategy == CountStrategy.WINDOW:
+        if data:
+            total, total_kind = data[0]._mapping[TOTAL_COLUMN], TotalKind.EXACT
+        elif skip:
+            # past the last page the window has no row to report the total on
+            total, total_kind = await count_total(db, count_query, CountStrategy.EXACT)
+        else:
+            total, total_kind = 0, TotalKind.EXACT
+    if entity_query:
+        data = [row[0] for row in data]
+
+    next_cursor = None
+    if len(data) > limit:
+        data = data[:limit]
+        last = data[-1]
+        next_cursor = encode_cursor(getattr(last, sort_by), last.id)
+    return Page(data=data, total=total, total_kind=total_kind, next_cursor=next_cursor)
+
+
+async def count_total(
+    db: AsyncSession, query: Select, strategy: CountStrategy
+) -> tuple[int, TotalKind]:
+    if strategy == CountStrategy.CAPPED:
+        cap = config.PAGINATION_COUNT_CAP
+        total = await db.scalar(
+            select(func.count()).select_from(query.limit(cap + 1).subquery())
+        )
+        if total > cap:
+            return cap, TotalKind.AT_LEAST
+        return total, TotalKind.EXACT
+
+    count_query = select(func.count()).select_from(query.subquery())
+    if strategy == CountStrategy.CACHED:
+        compiled = count_query.compile()
+        key = (str(compiled), repr(sorted(compiled.params.items())))
+        total = count_cache.get(key)
+        if total is not None:
+            return total, TotalKind.CACHED
+        total = await db.scalar(count_query)
+        count_cache.set(key, total)
+        return total, TotalKind.EXACT
+
+    return await db.scalar(count_query), TotalKind.EXACT
+
+
+def db_time_ago(db: AsyncSession, age: timedelta) -> ColumnElement:
     """
-    total = query.count()
+    The database clock minus `age`, to compare with the server-side (`func.now()`) timestamps.
+    The arithmetic runs in SQL and yields a naive timestamp like those columns, Postgres' now() is a
+    timestamptz that the driver would return timezone-aware.
+    """
+    if db.bind.dialect.name == "postgresql":
+        return func.localtimestamp() - age
+    # same text format as the SQLite now() of app.database.base
+    return type_coerce(
+        func.strftime("%Y-%m-%d %H:%M:%f000", "now", f"{-age.total_seconds():+f} seconds"),
+        DateTime,
+    )
+
+
+def db_time_in(db: AsyncSession, delay: timedelta = timedelta()) -> ColumnElement:
+    """The database clock plus `delay` (the current database time by default), see db_time_ago."""
+    return db_time_ago(db, -delay)
+
+
+def seconds_between(db: AsyncSession, start, end) -> ColumnElement:
+    """The number of seconds from timestamp `start` to timestamp `end`, computed in SQL."""
+    if db.bind.dialect.name == "postgresql":
+        return func.extract("epoch", end - start)
+    return (func.julianday(end) - func.julianday(start)) * 86400
+
+
+def upsert_insert(db: AsyncSession, model: object):
+    """Returns an INSERT for the session's dialect that supports `on_conflict_do_update`."""
+    if db.bind.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
 
-    if order == "asc":
-        query = query.order_by(asc(text(sort_by)))
+def is_entity_query(query: Select) -> bool:
+    columns = query.column_descriptions
+    return len(columns) == 1 and columns[0]["expr"] is columns[0]["entity"]
+
+
+def encode_cursor(sort_value, record_id: str) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, record_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_column) -> tuple:
+    try:
+        sort_value, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if sort_value is not None and sort_column.type.python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+    except (ValueError, TypeError):
+        raise BusinessError("Invalid cursor")
+    except NotImplementedError:
+        pass
+    return sort_value, record_id
+
+
+def _apply_cursor(query: Select, sort_column, id_column, order: str, cursor: str) -> Select:
+    sort_value, record_id = decode_cursor(cursor, sort_column)
+    sort_expr = sort_column.element if isinstance(sort_column, Label) else sort_column
+    id_expr = id_column.element if isinstance(id_column, Label) else id_column
+
+    if sort_expr is id_expr:
+        keys, values = id_expr, literal(record_id, id_expr.type)
     else:
-        query = query.order_by(desc(text(sort_by)))
-    query = query.offset(skip).limit(limit)
-    return Page(data=query.all(), total=total)
+        keys = tuple_(sort_expr, id_expr)
+        values = tuple_(literal(sort_value, sort_expr.type), literal(record_id, id_expr.type))
+    predicate = keys > values if order == "asc" else keys < values
+
+    # aggregated sort keys (e.g. an order total) can only be compared after grouping
+    if isinstance(sort_expr, FunctionElement):
+        return query.having(predicate)
+    return query.where(predicate)
@@ -0,0 +1,30 @@
+from typing import Optional
+
+from sqlalchemy import ColumnElement, delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.idempotency import IdempotencyKey
+
+
+class IdempotencyKeyRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.model = IdempotencyKey
+
+    async def get(self, user_id: str, key: str) -> Optional[IdempotencyKey]:
+        return await self.db.scalar(
+            select(self.model).where(self.model.user_id == user_id, self.model.key == key)
+        )
+
+    def save(self, entity: IdempotencyKey) -> IdempotencyKey:
+        self.db.add(entity)
+        return entity
+
+    async def delete(self, entity: IdempotencyKey) -> None:
+        await self.db.delete(entity)
+
+    async def delete_created_before(self, before: ColumnElement) -> int:
+        result = await self.db.execute(
+            delete(self.model).where(self.model.created_at < before)
+        )
+        return result.rowcount
@@ -1,19 +1,45 @@
 # app/repository/inventory.py
+import random
 from typing import Optional
-from sqlalchemy.orm import Session
-from app.models.inventory import SellerInventory
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.inventory import SellerInventory, SellerInventoryShard
 from app.models.product import Product
 from app.models.user import User
 from app.repository.common import find_paginated
 from app.schemas.common import Page
 
+# total stock of an inventory: shard 0 on the row itself plus the sub-counters of a sharded inventory
+STOCK = SellerInventory.quantity + func.coalesce(
+    select(func.sum(SellerInventoryShard.quantity))
+    .where(SellerInventoryShard.seller_inventory_id == SellerInventory.id)
+    .correlate(SellerInventory)
+    .scalar_subquery(),
+    0,
+)
+
 
 class SellerInventoryRepository:
-    def __init__(self, db: Session):
+    """
+    Seller inventories and their stock.
+    The stock of a hot inventory can be split into `shard_count` sub-counters: shard 0 is the `quantity`
+    column and shards 1..n-1 are rows of seller_inventory_shards, the available stock is their sum.
+    Unsharded inventories (shard_count 1) are adjusted in bulk with one UPDATE, a sharded one takes its units
+    from a random shard (then from the others in turn) so concurrent buyers rarely wait on the same row.
+    """
+
+    SORT_KEYS = {
+        "id": SellerInventory.id,
+        "price": SellerInventory.price,
+        "quantity": STOCK,
+        "product_name": Product.name,
+    }
+
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.model = SellerInventory
 
-    def find_all_pagination(
+    async def find_all_pagination(
         self,
         skip: int,
         limit: int,
@@ -21,11 +47,13 @@ class SellerInventoryRepository:
         order: str,
         search: str | None,
         seller_id: str | None,
+        cursor: str | None = None,
     ) -> Page:
         query = (
-            self.db.query(
+            select(
                 self.model.id,
-                self.model.quantity,
+                STOCK.label("quantity"),
+                self.model.shard_count,
                 self.model.price,
                 Product.id.label("product_id"),
                 Product.name.label("product_name"),
@@ -36,31 +64,209 @@ class SellerInventoryRepository:
             )
             .join(Product.inventory)
             .join(SellerInventory.seller)
-            .filter(self.model.delete == False)
+            .where(self.model.delete == False)
         )
 
         if seller_id:
-            query = query.filter(self.model.seller_id == seller_id)
+            query = query.where(self.model.seller_id == seller_id)
         if search:
-            query = query.filter(Product.name.icontains(search))
-        return find_paginated(query, self.model, skip, limit, sort_by, order)
+            query = query.where(Product.name.icontains(search))
+        return await find_paginated(
+            self.db, query, self.SORT_KEYS, skip, limit, sort_by, order, cursor
+        )
+
+    async def get_by_id(self, inv_id: str) -> Optional[SellerInventory]:
+        return await self.db.scalar(select(self.model).where(self.model.id == inv_id))
+
+    async def get_by_id_for_update(self, inv_id: str) -> Optional[SellerInventory]:
+        return await self.db.scalar(
+            select(self.model)
+            .where(self.model.id == inv_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+
+    async def decrement_stock(self, quantities: dict[str, int]) -> set[str]:
+        """
+        Takes `quantities[id]` units off the stock of every inventory.
+        Unsharded inventories are decremented by one conditional UPDATE, sharded ones shard by shard.
+        Inventories without enough stock are left untouched and missing from the result,
+        the caller decides whether a partial result aborts the transaction.
+        Args:
+            quantities (dict[str, int]): The quantity to take, by inventory id.
+        Returns:
+            set[str]: The ids of the decremented inventories.
+        """
+        amount = case(quantities, value=self.model.id)
+        taken = await self.__adjust_stock(
+            quantities, self.model.quantity - amount, self.model.quantity >= amount
+        )
+        if len(taken) < len(quantities):
+            sharded = await self.__find_sharded(set(quantities) - taken)
+            for inv_id, shard_count in sharded.items():
+                if await self.__decrement_sharded(inv_id, quantities[inv_id], shard_count):
+                    taken.add(inv_id)
+        return taken
+
+    async def increment_stock(self, quantities: dict[str, int]) -> set[str]:
+        """
+        Puts `quantities[id]` units back on the stock of every inventory,
+        unsharded inventories in one UPDATE and sharded ones on a random shard.
+        Args:
+            quantities (dict[str, int]): The quantity to return, by inventory id.
+        Returns:
+            set[str]: The ids of the incremented inventories.
+        """
+        amount = case(quantities, value=self.model.id)
+        restored = await self.__adjust_stock(quantities, self.model.quantity + amount)
+        if len(restored) < len(quantities):
+            sharded = await self.__find_sharded(set(quantities) - restored)
+            for inv_id, shard_count in sharded.items():
+                shard = random.randrange(shard_count)
+                await self.__adjust_shard(inv_id, shard, quantities[inv_id])
+                restored.add(inv_id)
+        return restored
+
+    async def get_stock_for_update(self, inv_ids) -> dict[str, int]:
+        """Locks the inventories and their shards in id order (so concurrent batches cannot deadlock) and returns their total stock by id."""
+        query = (
+            select(self.model.id, self.model.quantity, self.model.shard_count)
+            .where(self.model.id.in_(inv_ids))
+            .order_by(self.model.id)
+            .with_for_update()
+        )
+        rows = (await self.db.execute(query)).all()
+        stock = {row.id: row.quantity for row in rows}
+        sharded = [row.id for row in rows if row.shard_count > 1]
+        if sharded:
+            for inv_id, quantities in (await self.__lock_shards(sharded)).items():
+                stock[inv_id] += sum(quantities.values())
+        return stock
+
+    async def get_stock(self, inv_id: str) -> int:
+        return await self.db.scalar(select(STOCK).where(self.model.id == inv_id))
+
+    async def set_stock(self, entity: SellerInventory, quantity: int) -> None:
+        """Sets the total stock of the inventory, spread evenly over its shards."""
+        entity.quantity = quantity
+        if entity.shard_count > 1:
+            per_shard, rest = divmod(quantity, entity.shard_count)
+            entity.quantity = per_shard + rest
+            await self.db.execute(
+                update(SellerInventoryShard)
+                .where(SellerInventoryShard.seller_inventory_id == entity.id)
+                .values(quantity=per_shard)
+            )
 
-    def get_by_id(self, inv_id: str) -> Optional[SellerInventory]:
-        return self.db.query(self.model).filter(self.model.id == inv_id).first()
+    async def set_shard_count(self, entity: SellerInventory, shard_count: int) -> None:
+        """
+        Splits the stock of a locked inventory into `shard_count` shards (1 merges it back into the row),
+        keeping the total stock.
+        """
+        total = entity.quantity
+        if entity.shard_count > 1:
+            total += sum((await self.__lock_shards([entity.id])).get(entity.id, {}).values())
+            await self.db.execute(
+                delete(SellerInventoryShard).where(
+                    SellerInventoryShard.seller_inventory_id == entity.id
+                )
+            )
+        per_shard, rest = divmod(total, shard_count)
+        if shard_count > 1:
+            await self.db.execute(
+                insert(SellerInventoryShard),
+                [
+                    {"seller_inventory_id": entity.id, "shard": shard, "quantity": per_shard}
+                    for shard in range(1, shard_count)
+                ],
+            )
+        entity.quantity = per_shard + rest
+        entity.shard_count = shard_count
+
+    async def __adjust_stock(self, quantities: dict[str, int], new_quantity, *conditions) -> set[str]:
+        # the stock check and the write happen in the same statement,
+        # a row is never locked while Python decides what to write back
+        query = (
+            update(self.model)
+            .where(self.model.id.in_(quantities), self.model.shard_count == 1, *conditions)
+            .values(quantity=new_quantity)
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        return set(await self.db.scalars(query))
+
+    async def __find_sharded(self, inv_ids) -> dict[str, int]:
+        query = select(self.model.id, self.model.shard_count).where(
+            self.model.id.in_(inv_ids), self.model.shard_count > 1
+        )
+        return dict((await self.db.execute(query)).all())
+
+    async def __decrement_sharded(self, inv_id: str, amount: int, shard_count: int) -> bool:
+        for shard in random.sample(range(shard_count), shard_count):
+            if await self.__adjust_shard(inv_id, shard, -amount):
+                return True
+
+        # no single shard holds `amount` any more, take it from all of them under lock,
+        # shard 0 is read from the column (not the identity map, which may hold a stale row)
+        shards = {
+            0: await self.db.scalar(
+                select(self.model.quantity).where(self.model.id == inv_id).with_for_update()
+            )
+        }
+        shards.update((await self.__lock_shards([inv_id])).get(inv_id, {}))
+        if sum(shards.values()) < amount:
+            return False
+        for shard, quantity in shards.items():
+            take = min(quantity, amount)
+            if take:
+                if not await self.__adjust_shard(inv_id, shard, -take):
+                    return False
+                amount -= take
+        return amount == 0
 
-    def get_by_id_for_update(self, inv_id: str) -> Optional[SellerInventory]:
-        return (
-            self.db.query(self.model)
-            .filter(self.model.id == inv_id)
+    async def __adjust_shard(self, inv_id: str, shard: int, amount: int) -> bool:
+        """Adds `amount` (taking when negative) to one shard, refusing to go below zero."""
+        if shard == 0:
+            model, where = self.model, [self.model.id == inv_id]
+        else:
+            model = SellerInventoryShard
+            where = [model.seller_inventory_id == inv_id, model.shard == shard]
+        if amount < 0:
+            where.append(model.quantity >= -amount)
+        query = (
+            update(model)
+            .where(*where)
+            .values(quantity=model.quantity + amount)
+            .execution_options(synchronize_session=False)
+        )
+        return (await self.db.execute(query)).rowcount > 0
+
+    async def __lock_shards(self, inv_ids) -> dict[str, dict[int, int]]:
+        query = (
+            select(
+                SellerInventoryShard.seller_inventory_id,
+                SellerInventoryShard.shard,
+                SellerInventoryShard.quantity,
+            )
+            .where(SellerInventoryShard.seller_inventory_id.in_(inv_ids))
+            .order_by(SellerInventoryShard.seller_inventory_id, SellerInventoryShard.shard)
             .with_for_update()
-            .first()
         )
-    def get_by_product_and_seller_for_update(self, seller_id: str, product_id: str) -> Optional[SellerInventory]:
-        return (
-            self.db.query(self.model)
-            .filter(self.model.seller_id == seller_id, self.model.product_id == product_id)
+        shards: dict[str, dict[int, int]] = {}
+        for inv_id, shard, quantity in await self.db.execute(query):
+            shards.setdefault(inv_id, {})[shard] = quantity
+        return shards
+
+    async def find_existing_ids(self, inv_ids) -> set[str]:
+        return set(
+            await self.db.scalars(select(self.model.id).where(self.model.id.in_(inv_ids)))
+        )
+
+    async def get_by_product_and_seller_for_update(self, seller_id: str, product_id: str) -> Optional[SellerInventory]:
+        return await self.db.scalar(
+            select(self.model)
+            .where(self.model.seller_id == seller_id, self.model.product_id == product_id)
             .with_for_update()
-            .first()
         )
 
     def create(self, entity: SellerInventory) -> SellerInventory:
@@ -72,5 +278,5 @@ class SellerInventoryRepository:
     def delete(self, entity: SellerInventory) -> None:
         entity.delete = True
 
-    def delete_by_product_id(self, product_id: str) -> None:
-        self.db.query(self.model).filter(self.model.product_id == product_id).update({"delete": True})
+    async def delete_by_product_id(self, product_id: str) -> None:
+        await self.db.execute(update(self.model).where(self.model.product_id == product_id).values(delete=True))
@@ -0,0 +1,123 @@
+from sqlalchemy import ColumnElement, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import Job
+from app.repository.common import db_time_in, seconds_between, upsert_insert
+from app.utils.enums import JobStatus
+
+
+class JobRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.model = Job
+
+    async def enqueue(
+        self,
+        name: str,
+        payload: dict | None,
+        run_at: ColumnElement,
+        max_attempts: int,
+        dedupe_key: str | None = None,
+    ) -> bool:
+        """
+        Queues a job, a job whose `dedupe_key` is already queued or running is not queued again.
+        Returns:
+            bool: Whether the job was queued.
+        """
+        query = (
+            upsert_insert(self.db, self.model)
+            .values(
+                name=name,
+                payload=payload,
+                status=JobStatus.QUEUED,
+                attempts=0,
+                max_attempts=max_attempts,
+                run_at=run_at,
+                dedupe_key=dedupe_key,
+                created_at=db_time_in(self.db),
+            )
+            .on_conflict_do_nothing(index_elements=[self.model.dedupe_key])
+        )
+        return (await self.db.execute(query)).rowcount > 0
+
+    async def claim(self, stale_before: ColumnElement, limit: int) -> list[Job]:
+        """
+        Marks up to `limit` due jobs as RUNNING and returns them.
+        Due jobs are QUEUED ones whose run_at has passed and RUNNING ones locked before `stale_before`
+        (their worker died), both against the database clock. Concurrent workers skip each other's rows
+        instead of waiting on them.
+        """
+        now = db_time_in(self.db)
+        due = (
+            select(self.model.id)
+            .where(
+                or_(
+                    (self.model.status == JobStatus.QUEUED) & (self.model.run_at <= now),
+                    (self.model.status == JobStatus.RUNNING)
+                    & (self.model.locked_at < stale_before),
+                )
+            )
+            .order_by(self.model.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(self.model)
+            .where(self.model.id.in_(due.scalar_subquery()))
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=self.model.attempts + 1,
+                locked_at=now,
+            )
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+        return (await self.db.scalars(query)).all()
+
+    async def finish(
+        self, job_id: str, status: JobStatus, error: str | None = None
+    ) -> None:
+        await self.db.execute(
+            update(self.model)
+            .where(self.model.id == job_id)
+            .values(
+                status=status,
+                last_error=error,
+                dedupe_key=None,
+                locked_at=None,
+                finished_at=db_time_in(self.db),
+            )
+        )
+
+    async def retry(self, job_id: str, run_at: ColumnElement, error: str) -> None:
+        await self.db.execute(
+            update(self.model)
+            .where(self.model.id == job_id)
+            .values(
+                status=JobStatus.QUEUED, run_at=run_at, last_error=error, locked_at=None
+            )
+        )
+
+    async def delete_finished_before(self, before: ColumnElement) -> int:
+        result = await self.db.execute(
+            delete(self.model).where(
+                self.model.status.in_([JobStatus.DONE, JobStatus.FAILED]),
+                self.model.finished_at < before,
+            )
+        )
+        return result.rowcount
+
+    async def stats(self) -> dict:
+        now = db_time_in(self.db)
+        counts = await self.db.execute(
+            select(self.model.status, func.count()).group_by(self.model.status)
+        )
+        lag = await self.db.scalar(
+            select(seconds_between(self.db, func.min(self.model.run_at), now)).where(
+                self.model.status == JobStatus.QUEUED, self.model.run_at <= now
+            )
+        )
+        return {
+            "counts": {status.value: count for status, count in counts},
+            "lag_seconds": float(lag or 0),
+        }
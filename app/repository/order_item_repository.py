@@ -1,26 +1,31 @@
-from sqlalchemy.orm import Session
-from app.models.inventory import SellerInventory
-from app.models.order import OrderItem
-from app.models.product import Product
+from sqlalchemy import select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.order import OrderItem, OrderItemArchive
 
 
 class OrderItemRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.model = OrderItem
 
-    def find_orders_items(self, order_id: str):
-        return (
-            self.db.query(
-                self.model.id,
-                self.model.quantity,
-                self.model.price_at_purchase,
-                Product.name.label("product_name"),
-                Product.image.label("product_image"),
-                Product.description.label("product_description"),
+    async def find_orders_items(self, order_id: str):
+        return await self.find_items_by_order_ids([order_id])
+
+    async def find_items_by_order_ids(self, order_ids: list[str]):
+        """Fetches the items of all the given orders in one query, each row carries its `order_id`."""
+        # the items of an archived order are in order_items_archive
+        query = union_all(
+            *(
+                select(
+                    model.id,
+                    model.order_id,
+                    model.quantity,
+                    model.price_at_purchase,
+                    model.product_name,
+                    model.product_image,
+                    model.product_description,
+                ).where(model.order_id.in_(order_ids))
+                for model in (self.model, OrderItemArchive)
             )
-            .join(SellerInventory, SellerInventory.id == self.model.seller_inventory_id)
-            .join(Product, Product.id == SellerInventory.product_id)
-            .filter(self.model.order_id == order_id)
-            .all()
         )
+        return (await self.db.execute(query)).all()
@@ -1,63 +1,83 @@
-from sqlalchemy import func, not_
-from sqlalchemy.orm import Session, joinedload, aliased
-from app.models.order import Order, OrderItem
+from sqlalchemy import ColumnElement, delete, func, insert, not_, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, aliased
+from app.models.order import Order, OrderArchive, OrderItem, OrderItemArchive
 from app.models.user import User
-from app.repository.common import find_paginated
+from app.repository.common import find_paginated, seconds_between
 from app.schemas.common import Page
 from app.schemas.order import OrderStatus
 from typing import Optional
 
 
+# finished orders, listed by the order history and eventually moved to the archive tables
+FINISHED_STATUSES = [
+    OrderStatus.DONE,
+    OrderStatus.CANCELLED,
+    OrderStatus.AUTO_CANCELLED,
+]
+
+
 class OrderRepository:
-    def __init__(self, db: Session):
+    # sortable columns, looked up on the listed table (or the history UNION)
+    SORT_COLUMNS = ("id", "created_at", "updated_at", "status", "total")
+
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.model = Order
 
     def __build_order_query(self, party: str, party_id: str, history: bool):
+        if history:
+            # finished orders stay in `orders` until the archive job moves them to `orders_archive`
+            orders = union_all(
+                self.__select_orders(self.model, party, party_id).where(
+                    self.model.status.in_(FINISHED_STATUSES)
+                ),
+                self.__select_orders(OrderArchive, party, party_id),
+            ).subquery("orders")
+        else:
+            orders = self.model.__table__
+
         buyer = aliased(User)
         seller = aliased(User)
-
         query = (
-            self.db.query(
-                self.model.id,
+            select(
+                orders.c.id,
                 buyer.name.label("buyer_id"),
                 buyer.name.label("buyer_name"),
                 seller.name.label("seller_id"),
                 seller.name.label("seller_name"),
-                self.model.status,
-                self.model.created_at,
-                self.model.updated_at,
-                func.sum(OrderItem.quantity * OrderItem.price_at_purchase).label(
-                    "total"
-                ),
+                orders.c.status,
+                orders.c.created_at,
+                orders.c.updated_at,
+                orders.c.total,
+                orders.c.item_count,
             )
-            .join(buyer, buyer.id == Order.buyer_id)
-            .join(seller, seller.id == Order.seller_id)
-            .join(OrderItem, OrderItem.order_id == self.model.id)
-            .filter(getattr(self.model, f"{party}_id") == party_id)
+            .join(buyer, buyer.id == orders.c.buyer_id)
+            .join(seller, seller.id == orders.c.seller_id)
         )
+        if not history:
+            query = query.where(
+                orders.c[f"{party}_id"] == party_id,
+                not_(orders.c.status.in_(FINISHED_STATUSES)),
+            )
 
-        status_filter = [
-            OrderStatus.DONE,
-            OrderStatus.CANCELLED,
-            OrderStatus.AUTO_CANCELLED,
-        ]
+        sort_keys = {key: orders.c[key] for key in self.SORT_COLUMNS}
+        return query, sort_keys
 
-        if history:
-            query = query.filter(self.model.status.in_(status_filter))
-        else:
-            query = query.filter(not_(self.model.status.in_(status_filter)))
-
-        return query.group_by(
-            self.model.id,
-            buyer.name,
-            seller.name,
-            self.model.status,
-            self.model.created_at,
-            self.model.updated_at,
-        )
+    @staticmethod
+    def __select_orders(model, party: str, party_id: str):
+        return select(
+            model.id,
+            model.buyer_id,
+            model.seller_id,
+            model.status,
+            model.created_at,
+            model.updated_at,
+            model.total,
+            model.item_count,
+        ).where(getattr(model, f"{party}_id") == party_id)
 
-    def find_orders_by_seller(
+    async def find_orders_by_seller(
         self,
         skip: int,
         limit: int,
@@ -65,11 +85,14 @@ class OrderRepository:
         order: str,
         seller_id: str,
         history: bool = False,
+        cursor: str | None = None,
     ) -> Page:
-        query = self.__build_order_query("seller", seller_id, history)
-        return find_paginated(query, self.model, skip, limit, sort_by, order)
+        query, sort_keys = self.__build_order_query("seller", seller_id, history)
+        return await find_paginated(
+            self.db, query, sort_keys, skip, limit, sort_by, order, cursor
+        )
 
-    def find_orders_by_buyer(
+    async def find_orders_by_buyer(
         self,
         skip: int,
         limit: int,
@@ -77,20 +100,127 @@ class OrderRepository:
         order: str,
         buyer_id: str,
         history: bool = False,
+        cursor: str | None = None,
     ) -> Page:
-        query = self.__build_order_query("buyer", buyer_id, history)
-        return find_paginated(query, self.model, skip, limit, sort_by, order)
+        query, sort_keys = self.__build_order_query("buyer", buyer_id, history)
+        return await find_paginated(
+            self.db, query, sort_keys, skip, limit, sort_by, order, cursor
+        )
 
-    def get_order_by_id(self, order_id: str) -> Optional[Order]:
-        return (
-            self.db.query(self.model)
-            .filter(self.model.id == order_id)
+    async def get_order_by_id(self, order_id: str, for_update: bool = False) -> Optional[Order]:
+        query = (
+            select(self.model)
+            .where(self.model.id == order_id)
             .options(joinedload(self.model.items))
-            .first()
         )
+        if for_update:
+            # only the order row, the items sit on the nullable side of the outer join
+            query = query.with_for_update(of=self.model)
+        result = await self.db.execute(query)
+        return result.unique().scalars().first()
 
-    def create_order_with_items(self, order: list[Order]):
-        self.db.add_all(order)
+    async def find_states_for_update(self, order_ids: list[str]) -> dict[str, tuple]:
+        """Locks the orders and returns their (status, buyer_id, seller_id) by order id."""
+        result = await self.db.execute(
+            select(self.model.id, self.model.status, self.model.buyer_id, self.model.seller_id)
+            .where(self.model.id.in_(order_ids))
+            .order_by(self.model.id)
+            .with_for_update()
+        )
+        return {order_id: state for order_id, *state in result.all()}
+
+    async def create_orders_with_items(self, orders: list[dict], items: list[dict]) -> None:
+        # one multi-row INSERT per table instead of an ORM flush per object
+        await self.db.execute(insert(self.model), orders)
+        await self.db.execute(insert(OrderItem), items)
+
+    async def auto_cancel_pending(self, before: ColumnElement, limit: int) -> list[str]:
+        """
+        Moves up to `limit` PENDING orders created before `before` to AUTO_CANCELLED with one UPDATE.
+        Returns:
+            list[str]: The ids of the cancelled orders.
+        """
+        # concurrent runs skip each other's rows instead of waiting on them
+        stale = (
+            select(self.model.id)
+            .where(self.model.status == OrderStatus.PENDING, self.model.created_at < before)
+            .order_by(self.model.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return (
+            await self.db.scalars(
+                update(self.model)
+                .where(self.model.id.in_(stale.scalar_subquery()))
+                .values(status=OrderStatus.AUTO_CANCELLED, updated_at=func.now())
+                .returning(self.model.id)
+                .execution_options(synchronize_session=False)
+            )
+        ).all()
+
+    async def sum_item_quantities(self, order_ids: list[str]) -> dict[str, int]:
+        """Sums the item quantities of the orders by inventory id."""
+        items = await self.db.execute(
+            select(OrderItem.seller_inventory_id, func.sum(OrderItem.quantity))
+            .where(OrderItem.order_id.in_(order_ids))
+            .group_by(OrderItem.seller_inventory_id)
+        )
+        return dict(items.all())
+
+    async def find_pending_lag_seconds(self, before: ColumnElement) -> float:
+        """How long the oldest PENDING order created before `before` has been waiting past it, 0 without one."""
+        lag = await self.db.scalar(
+            select(seconds_between(self.db, func.min(self.model.created_at), before)).where(
+                self.model.status == OrderStatus.PENDING, self.model.created_at < before
+            )
+        )
+        return float(lag or 0)
+
+    async def archive_finished(self, before: ColumnElement, limit: int) -> int:
+        """
+        Moves up to `limit` finished orders last updated before `before`, with their items,
+        to the archive tables (INSERT ... SELECT then DELETE, one statement per table).
+        Returns:
+            int: The number of archived orders.
+        """
+        # concurrent runs skip each other's rows instead of waiting on them
+        order_ids = (
+            await self.db.scalars(
+                select(self.model.id)
+                .where(
+                    self.model.status.in_(FINISHED_STATUSES),
+                    self.model.updated_at < before,
+                )
+                .order_by(self.model.updated_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+        ).all()
+        if not order_ids:
+            return 0
+
+        for model, archive, where in (
+            (self.model, OrderArchive, self.model.id.in_(order_ids)),
+            (OrderItem, OrderItemArchive, OrderItem.order_id.in_(order_ids)),
+        ):
+            columns = [column.name for column in archive.__table__.columns]
+            await self.db.execute(
+                insert(archive).from_select(
+                    columns,
+                    select(*(model.__table__.c[column] for column in columns)).where(where),
+                )
+            )
+        await self.db.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+        await self.db.execute(delete(self.model).where(self.model.id.in_(order_ids)))
+        return len(order_ids)
+
+    async def update_orders_status(self, order_ids: list[str], new_status: OrderStatus) -> None:
+        await self.db.execute(
+            update(self.model)
+            .where(self.model.id.in_(order_ids))
+            .values(status=new_status, updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
 
     def update_order_status(self, order: Order, new_status: OrderStatus):
         order.status = new_status.value
@@ -1,7 +1,7 @@
-from sqlalchemy import desc, func
-from sqlalchemy.orm import Session
+from sqlalchemy import desc, func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.inventory import SellerInventory
-from app.models.order import Order, OrderItem
+from app.models.order import Order, OrderArchive, OrderItem, OrderItemArchive
 from app.models.product import Product
 from app.repository.common import find_paginated
 from typing import Optional
@@ -11,47 +11,64 @@ from app.utils.enums import OrderStatus
 
 
 class ProductRepository:
-    def __init__(self, db: Session):
+    SORT_KEYS = {"id": Product.id, "name": Product.name}
+
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.model = Product
 
-    def find_all(self) -> list[tuple[str, str]]:
-        return self.db.query(self.model.id, self.model.name).filter(self.model.delete == False).all()
+    async def find_all(self) -> list[tuple[str, str]]:
+        return (await self.db.execute(select(self.model.id, self.model.name).where(self.model.delete == False))).all()
 
-    def find_all_paginated(
-        self, skip: int, limit: int, sort_by: str, order: str, search: str | None
+    async def find_all_paginated(
+        self,
+        skip: int,
+        limit: int,
+        sort_by: str,
+        order: str,
+        search: str | None,
+        cursor: str | None = None,
     ) -> Page:
-        query = self.db.query(self.model).filter(self.model.delete == False)
+        query = select(self.model).where(self.model.delete == False)
         if search:
-            query = query.filter(self.model.name.icontains(search))
-        return find_paginated(query, self.model, skip, limit, sort_by, order)
+            query = query.where(self.model.name.icontains(search))
+        return await find_paginated(
+            self.db, query, self.SORT_KEYS, skip, limit, sort_by, order, cursor
+        )
 
-    def find_by_id(self, product_id: str) -> Optional[Product]:
-        return (
-            self.db.query(self.model)
-            .filter(self.model.id == product_id)
-            .filter(self.model.delete == False)
-            .first()
+    async def find_by_id(self, product_id: str) -> Optional[Product]:
+        return await self.db.scalar(
+            select(self.model)
+            .where(self.model.id == product_id)
+            .where(self.model.delete == False)
         )
 
-    def find_top_products(self, limit: int):
-        return (
-            self.db.query(
+    async def find_top_products(self, limit: int):
+        # DONE orders are either still in `orders` or already archived
+        sold = union_all(
+            *(
+                select(item.seller_inventory_id, item.quantity)
+                .join(order, order.id == item.order_id)
+                .where(order.status == OrderStatus.DONE)
+                for order, item in ((Order, OrderItem), (OrderArchive, OrderItemArchive))
+            )
+        ).subquery()
+        query = (
+            select(
                 self.model.id.label("id"),
                 self.model.name.label("name"),
                 self.model.image.label("image"),
-                func.sum(OrderItem.quantity).label("total_sold"),
+                func.sum(sold.c.quantity).label("total_sold"),
             )
-            .join(SellerInventory, SellerInventory.id == OrderItem.seller_inventory_id)
+            .select_from(sold)
+            .join(SellerInventory, SellerInventory.id == sold.c.seller_inventory_id)
             .join(self.model, self.model.id == SellerInventory.product_id)
-            .join(Order, Order.id == OrderItem.order_id)
-            .filter(Order.status == OrderStatus.DONE)
-            .filter(self.model.delete == False)
+            .where(self.model.delete == False)
             .group_by(self.model.id, self.model.name, self.model.image)
             .order_by(desc("total_sold"))
             .limit(limit)
-            .all()
         )
+        return (await self.db.execute(query)).all()
 
     def save(self, product: Product) -> Product:
         self.db.add(product)
@@ -0,0 +1,62 @@
+from datetime import datetime
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.reservation import StockReservation
+
+
+class StockReservationRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.model = StockReservation
+
+    async def get_for_update(
+        self, buyer_id: str, inventory_ids: list[str]
+    ) -> list[StockReservation]:
+        return (
+            await self.db.scalars(
+                select(self.model)
+                .where(
+                    self.model.buyer_id == buyer_id,
+                    self.model.seller_inventory_id.in_(inventory_ids),
+                )
+                .order_by(self.model.seller_inventory_id)
+                .with_for_update()
+            )
+        ).all()
+
+    def save(self, reservation: StockReservation) -> StockReservation:
+        self.db.add(reservation)
+        return reservation
+
+    async def release(
+        self, buyer_id: str, inventory_ids: list[str] | None = None
+    ) -> dict[str, int]:
+        query = delete(self.model).where(self.model.buyer_id == buyer_id)
+        if inventory_ids is not None:
+            query = query.where(self.model.seller_inventory_id.in_(inventory_ids))
+        return await self.__delete_returning(query)
+
+    async def release_expired(self, now: datetime, limit: int) -> dict[str, int]:
+        # concurrent sweepers skip each other's rows instead of waiting on them
+        expired = (
+            select(self.model.id)
+            .where(self.model.expires_at <= now)
+            .order_by(self.model.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return await self.__delete_returning(
+            delete(self.model).where(self.model.id.in_(expired.scalar_subquery()))
+        )
+
+    async def __delete_returning(self, query) -> dict[str, int]:
+        """Deletes the matching holds and sums their quantities by inventory id."""
+        result = await self.db.execute(
+            query.returning(self.model.seller_inventory_id, self.model.quantity)
+            .execution_options(synchronize_session=False)
+        )
+        released = {}
+        for inventory_id, quantity in result:
+            released[inventory_id] = released.get(inventory_id, 0) + quantity
+        return released
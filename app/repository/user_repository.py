@@ -1,31 +1,59 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.repository.common import find_paginated
 from typing import Optional
 
 
 class UserRepository:
-    def __init__(self, db: Session):
+    SORT_KEYS = {"id": User.id, "name": User.name, "username": User.username}
+
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.model = User
 
-    def find_all_paginated(
-        self, skip: int, limit: int, sort_by: str, order: str, search: str | None
+    async def find_all_paginated(
+        self,
+        skip: int,
+        limit: int,
+        sort_by: str,
+        order: str,
+        search: str | None,
+        cursor: str | None = None,
     ):
-        query = self.db.query(self.model).filter(self.model.delete == False)
+        query = select(self.model).where(self.model.delete == False)
 
         if search:
-            query = query.filter(
+            query = query.where(
                 self.model.username.icontains(search)
                 | self.model.name.icontains(search)
             )
-        return find_paginated(query, self.model, skip, limit, sort_by, order)
+        return await find_paginated(
+            self.db, query, self.SORT_KEYS, skip, limit, sort_by, order, cursor
+        )
+
+    async def find_by_id(self, user_id: str) -> Optional[User]:
+        return await self.db.scalar(select(self.model).where(self.model.id == user_id).where(self.model.delete == False))
+
+    async def find_by_username(self, username: str) -> Optional[User]:
+        return await self.db.scalar(select(self.model).where(self.model.username == username).where(self.model.delete == False))
 
-    def find_by_id(self, user_id: str) -> Optional[User]:
-        return self.db.query(self.model).filter(self.model.id == user_id).filter(self.model.delete == False).first()
+    async def find_token_states(self, since: datetime | None):
+        query = select(
+            self.model.id,
+            self.model.token_version,
+            self.model.delete,
+            self.model.updated_at,
+        )
+        if since is None:
+            query = query.where((self.model.token_version > 0) | (self.model.delete == True))
+        else:
+            query = query.where(self.model.updated_at >= since)
+        return (await self.db.execute(query)).all()
 
-    def find_by_username(self, username: str) -> Optional[User]:
-        return self.db.query(self.model).filter(self.model.username == username).filter(self.model.delete == False).first()
+    async def find_last_updated_at(self) -> datetime | None:
+        return await self.db.scalar(select(func.max(self.model.updated_at)))
 
     def save(self, user: User) -> User:
         self.db.add(user)
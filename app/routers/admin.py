@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, File, Form, UploadFile
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.session import get_db
 from app.core.dependency import require_roles
@@ -28,35 +28,37 @@ async def list_users(
     sort_by: str = "id",
     order: str = "asc",
     search: str | None = None,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db),
 ):
     service = UserService(db)
-    return service.get_paginated(page, size, sort_by, order, search)
+    return await service.get_paginated(page, size, sort_by, order, search, cursor)
 
 
 @router.post("/")
-async def create_user(data: UserCreate, db: Session = Depends(get_db)):
+async def create_user(data: UserCreate, db: AsyncSession = Depends(get_db)):
     service = UserService(db)
-    return service.insert_user(data)
+    return await service.insert_user(data)
 
 
 @router.delete("/{user_id}")
-async def delete_user(user_id: str, db: Session = Depends(get_db)):
+async def delete_user(user_id: str, db: AsyncSession = Depends(get_db)):
     service = UserService(db)
-    return service.delete_user(user_id)
+    return await service.delete_user(user_id)
 
 
 @router.get("/products", response_model=ProductPageResponse)
-def list_products(
+async def list_products(
     page: int = 1,
     size: int = 10,
     sort_by: str = "id",
     order: str = "asc",
     search: str | None = None,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db),
 ):
     service = ProductService(db)
-    return service.get_paginated(page, size, sort_by, order, search)
+    return await service.get_paginated(page, size, sort_by, order, search, cursor)
 
 
 @router.post("/products")
@@ -64,7 +66,7 @@ async def add_product(
     name: str = Form(...),
     description: str = Form(""),
     image: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = ProductService(db)
     data = ProductCreate(name=name, description=description)
@@ -77,7 +79,7 @@ async def update_product(
     name: str = Form(...),
     description: str = Form(""),
     image: UploadFile = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = ProductService(db)
     data = ProductUpdate(id=product_id, name=name, description=description)
@@ -85,6 +87,6 @@ async def update_product(
 
 
 @router.delete("/products/{product_id}")
-async def delete_product(product_id: str, db: Session = Depends(get_db)):
+async def delete_product(product_id: str, db: AsyncSession = Depends(get_db)):
     service = ProductService(db)
-    return service.delete_product(product_id)
+    return await service.delete_product(product_id)
@@ -1,7 +1,7 @@
 from typing_extensions import Annotated
 from fastapi import APIRouter, Depends, Request
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from requests import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.session import get_db
 from app.schemas.user import (
@@ -17,37 +17,37 @@ router = APIRouter(tags=["Authentication"])
 
 
 @router.post("/login", response_model=UserLoginResponse)
-def login(
+async def login(
     credentials: Annotated[HTTPBasicCredentials, Depends(HTTPBasic())],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = AuthService(db)
-    return service.authenticate_user(credentials.username, credentials.password)
+    return await service.authenticate_user(credentials.username, credentials.password)
 
 
 @router.post("/register")
-def register_seller(data: UserCreate, db: Session = Depends(get_db)):
+async def register_seller(data: UserCreate, db: AsyncSession = Depends(get_db)):
     service = AuthService(db)
-    return service.register_user(data)
+    return await service.register_user(data)
 
 
 @router.get("/secured/profile", response_model=UserResponse)
-def get_profile(request: Request, db: Session = Depends(get_db)):
+async def get_profile(request: Request, db: AsyncSession = Depends(get_db)):
     service = AuthService(db)
-    return service.get_profile(request.state.user.id)
+    return await service.get_profile(request.state.user.id)
 
 
 @router.patch("/secured/profile", response_model=UserResponse)
-def update_profile(data: UserUpdate, request: Request, db: Session = Depends(get_db)):
+async def update_profile(data: UserUpdate, request: Request, db: AsyncSession = Depends(get_db)):
     service = AuthService(db)
-    return service.update_profile(request.state.user.id, data)
+    return await service.update_profile(request.state.user.id, data)
 
 
 @router.patch("/secured/change-password")
-def change_password(
-    body: UserUpdatePassword, request: Request, db: Session = Depends(get_db)
+async def change_password(
+    body: UserUpdatePassword, request: Request, db: AsyncSession = Depends(get_db)
 ):
     service = AuthService(db)
-    return service.change_password(
+    return await service.change_password(
         request.state.user.id, body.old_password, body.new_password
     )
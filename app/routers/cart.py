@@ -1,8 +1,9 @@
 # app/routers/checkout.py
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependency import require_roles
+from app.core.idempotency import IdempotentRoute
 from app.database.session import get_db
 from app.schemas.cart import CartItemCreate, CartItemResponse
 from app.services.cart_service import CartService
@@ -12,47 +13,56 @@ router = APIRouter(
     prefix="/secured/cart",
     tags=["Cart"],
     dependencies=[Depends(require_roles(RoleEnum.BUYER))],
+    route_class=IdempotentRoute,
 )
 
 
 @router.get("/", response_model=list[CartItemResponse])
-def list_cart(request: Request, db: Session = Depends(get_db)):
+async def list_cart(request: Request, db: AsyncSession = Depends(get_db)):
     service = CartService(db)
-    return service.list_cart(request.state.user.id)
+    return await service.list_cart(request.state.user.id)
 
 
 @router.post("/")
-def add_to_cart(items: CartItemCreate, request: Request, db: Session = Depends(get_db)):
+async def add_to_cart(items: CartItemCreate, request: Request, db: AsyncSession = Depends(get_db)):
     service = CartService(db)
-    return service.add_to_cart(request.state.user.id, items)
+    return await service.add_to_cart(request.state.user.id, items)
+
+
+@router.post("/bulk")
+async def add_items_to_cart(
+    items: list[CartItemCreate], request: Request, db: AsyncSession = Depends(get_db)
+):
+    service = CartService(db)
+    return await service.add_items_to_cart(request.state.user.id, items)
 
 
 @router.put("/{cart_item_id}")
-def update_cart_item(
+async def update_cart_item(
     cart_item_id: str,
     quantity: int,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = CartService(db)
-    return service.update_cart_item(cart_item_id, quantity, request.state.user.id)
+    return await service.update_cart_item(cart_item_id, quantity, request.state.user.id)
 
 
 @router.delete("/{cart_item_id}")
-def delete_cart_item(
-    cart_item_id: str, request: Request, db: Session = Depends(get_db)
+async def delete_cart_item(
+    cart_item_id: str, request: Request, db: AsyncSession = Depends(get_db)
 ):
     service = CartService(db)
-    return service.delete_cart_item(cart_item_id, request.state.user.id)
+    return await service.delete_cart_item(cart_item_id, request.state.user.id)
 
 
 @router.delete("/")
-def clear_cart(request: Request, db: Session = Depends(get_db)):
+async def clear_cart(request: Request, db: AsyncSession = Depends(get_db)):
     service = CartService(db)
-    return service.clear_cart(request.state.user.id)
+    return await service.clear_cart(request.state.user.id)
 
 
 @router.post("/checkout")
-def checkout(request: Request, db: Session = Depends(get_db)):
+async def checkout(request: Request, db: AsyncSession = Depends(get_db)):
     service = CartService(db)
-    return service.checkout(request.state.user.id)
+    return await service.checkout(request.state.user.id)
@@ -0,0 +1,58 @@
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import count_cache, idempotency_cache, token_cache
+from app.core.dependency import require_roles
+from app.core.revocation import revocations
+from app.database.pool import pool_status
+from app.database.session import engine, get_db, replica_engine
+from app.repository.job_repository import JobRepository
+from app.services.checkout_pipeline import checkout_pipeline
+from app.task.auto_cancel import auto_cancel_stats
+from app.task.worker import job_worker
+from app.services.password_service import password_service
+from app.utils.enums import RoleEnum
+
+router = APIRouter(
+    prefix="/secured/internal",
+    tags=["Internal"],
+    dependencies=[Depends(require_roles(RoleEnum.ADMIN))],
+)
+
+
+@router.get("/cache")
+def cache_stats():
+    return {
+        "token": token_cache.stats(),
+        "revocations": revocations.stats(),
+        "count": count_cache.stats(),
+        "idempotency": idempotency_cache.stats(),
+    }
+
+
+@router.get("/password-hashing")
+def password_hashing_stats():
+    return password_service.stats()
+
+
+@router.get("/checkout-pipeline")
+def checkout_pipeline_stats():
+    return checkout_pipeline.stats()
+
+
+@router.get("/jobs")
+async def job_stats(db: AsyncSession = Depends(get_db)):
+    return {
+        "queue": await JobRepository(db).stats(),
+        "worker": job_worker.stats(),
+        "auto_cancel": auto_cancel_stats,
+    }
+
+
+@router.get("/db-pool")
+def db_pool_stats():
+    return {
+        "primary": pool_status(engine),
+        "replica": pool_status(replica_engine) if replica_engine else None,
+    }
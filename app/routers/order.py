@@ -1,27 +1,37 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.session import get_db
 from app.models.user import User
-from app.schemas.order import OrderItemResponse, OrderPageResponse
+from app.schemas.order import (
+    OrderBulkStatusUpdate,
+    OrderItemResponse,
+    OrderPageResponse,
+    OrderStatusResult,
+)
 from app.services.order_service import OrderService
 from app.core.dependency import require_roles
+from app.core.idempotency import IdempotentRoute
 from app.utils.enums import OrderStatus, RoleEnum
 
-router = APIRouter(prefix="/secured/orders", tags=["Orders"])
+router = APIRouter(
+    prefix="/secured/orders", tags=["Orders"], route_class=IdempotentRoute
+)
 
 
 @router.get("/", response_model=OrderPageResponse)
-def list_orders(
+async def list_orders(
     page: int = 1,
     size: int = 10,
     sort_by: str = "created_at",
     order: str = "desc",
+    cursor: str | None = None,
+    include: str | None = None,
     user: User = Depends(require_roles(RoleEnum.SELLER, RoleEnum.BUYER)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = OrderService(db)
-    return service.list_orders(page, size, sort_by, order, user)
+    return await service.list_orders(page, size, sort_by, order, user, cursor, include)
 
 
 @router.get(
@@ -29,62 +39,96 @@ def list_orders(
     dependencies=[Depends(require_roles(RoleEnum.SELLER, RoleEnum.BUYER))],
     response_model=list[OrderItemResponse],
 )
-def get_order(
+async def get_order(
     order_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+):
+    service = OrderService(db)
+    return await service.get_order_items(order_id)
+
+
+@router.patch("/bulk/confirm", response_model=list[OrderStatusResult])
+async def confirm_orders(
+    body: OrderBulkStatusUpdate,
+    user: User = Depends(require_roles(RoleEnum.SELLER)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = OrderService(db)
+    return await service.update_orders_status(body.order_ids, OrderStatus.CONFIRMED, user)
+
+
+@router.patch("/bulk/ready", response_model=list[OrderStatusResult])
+async def ready_orders(
+    body: OrderBulkStatusUpdate,
+    user: User = Depends(require_roles(RoleEnum.SELLER)),
+    db: AsyncSession = Depends(get_db),
+):
+    service = OrderService(db)
+    return await service.update_orders_status(body.order_ids, OrderStatus.READY, user)
+
+
+@router.patch("/bulk/cancel", response_model=list[OrderStatusResult])
+async def cancel_orders(
+    body: OrderBulkStatusUpdate,
+    user: User = Depends(require_roles(RoleEnum.SELLER, RoleEnum.BUYER)),
+    db: AsyncSession = Depends(get_db),
 ):
     service = OrderService(db)
-    return service.get_order_items(order_id)
+    return await service.update_orders_status(body.order_ids, OrderStatus.CANCELLED, user)
 
 
 @router.patch("/{order_id}/confirm")
-def confirm_order(
+async def confirm_order(
     order_id: str,
     user: User = Depends(require_roles(RoleEnum.SELLER)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = OrderService(db)
-    return service.update_order_status(order_id, OrderStatus.CONFIRMED, user)
+    return await service.update_order_status(order_id, OrderStatus.CONFIRMED, user)
 
 
 @router.patch("/{order_id}/ready")
-def ready_order(
+async def ready_order(
     order_id: str,
     user: User = Depends(require_roles(RoleEnum.SELLER)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = OrderService(db)
-    return service.update_order_status(order_id, OrderStatus.READY, user)
+    return await service.update_order_status(order_id, OrderStatus.READY, user)
 
 
 @router.patch("/{order_id}/done")
-def complete_order(
+async def complete_order(
     order_id: str,
     user: User = Depends(require_roles(RoleEnum.BUYER)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = OrderService(db)
-    return service.update_order_status(order_id, OrderStatus.DONE, user)
+    return await service.update_order_status(order_id, OrderStatus.DONE, user)
 
 
 @router.patch("/{order_id}/cancel")
-def cancel_order(
+async def cancel_order(
     order_id: str,
     user: User = Depends(require_roles(RoleEnum.SELLER, RoleEnum.BUYER)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = OrderService(db)
-    return service.update_order_status(order_id, OrderStatus.CANCELLED, user)
+    return await service.update_order_status(order_id, OrderStatus.CANCELLED, user)
 
 
 @router.get("/history", response_model=OrderPageResponse)
-def order_history(
+async def order_history(
     page: int = 1,
     size: int = 10,
     sort_by: str = "created_at",
     order: str = "desc",
+    cursor: str | None = None,
+    include: str | None = None,
     user: User = Depends(require_roles(RoleEnum.SELLER, RoleEnum.BUYER)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = OrderService(db)
-    return service.get_order_history(user, page, size, sort_by, order)
+    return await service.get_order_history(
+        user, page, size, sort_by, order, cursor, include
+    )
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependency import require_roles
 from app.database.session import get_db
@@ -17,22 +17,25 @@ router = APIRouter(
 
 
 @router.get("", response_model=SellerInventoryPageResponse)
-def list_inventory(
+async def list_inventory(
     page: int = 1,
     size: int = 10,
     sort_by: str = "id",
     order: str = "asc",
     search: str | None = None,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db),
 ):
     service = SellerInventoryService(db)
-    return service.list_all_inventory(page, size, sort_by, order, search)
+    return await service.list_all_inventory(
+        page, size, sort_by, order, search, cursor=cursor
+    )
 
 
 @router.get("/landing", response_model=list[ProductLandingPage])
-def landing_page(
+async def landing_page(
     limit: int = 5,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = ProductService(db)
-    return service.get_landing_page(limit)
+    return await service.get_landing_page(limit)
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependency import require_roles
+from app.core.idempotency import IdempotentRoute
 from app.database.session import get_db
 from app.schemas.inventory import (
     SellerInventoryCreate,
     SellerInventoryPageResponse,
     SellerInventoryResponse,
+    SellerInventoryShards,
 )
 from app.schemas.product import ProductDropListResponse
 from app.services.inventory_service import SellerInventoryService
@@ -16,55 +18,70 @@ router = APIRouter(
     prefix="/secured/seller-inventory",
     tags=["Seller Inventory"],
     dependencies=[Depends(require_roles(RoleEnum.SELLER))],
+    route_class=IdempotentRoute,
 )
 
 
 @router.get("/", response_model=SellerInventoryPageResponse)
-def list_inventory(
+async def list_inventory(
     request: Request,
     page: int = 1,
     size: int = 10,
     sort_by: str = "id",
     order: str = "asc",
     search: str | None = None,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db),
 ):
     service = SellerInventoryService(db)
-    return service.list_all_inventory(
-        page, size, sort_by, order, search, request.state.user.id
+    return await service.list_all_inventory(
+        page, size, sort_by, order, search, request.state.user.id, cursor
     )
 
 
 @router.get("/products", response_model=list[ProductDropListResponse])
-def get_product_list(db: Session = Depends(get_db)):
+async def get_product_list(db: AsyncSession = Depends(get_db)):
     service = SellerInventoryService(db)
-    return service.get_product_list()
+    return await service.get_product_list()
 
 
 @router.post("/", response_model=SellerInventoryResponse)
-def add_inventory(
+async def add_inventory(
     payload: SellerInventoryCreate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = SellerInventoryService(db)
-    return service.add_inventory(payload, request.state.user.id)
+    return await service.add_inventory(payload, request.state.user.id)
 
 
 @router.put("/{inventory_id}")
-def update_inventory(
+async def update_inventory(
     inventory_id: str,
     payload: SellerInventoryCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = SellerInventoryService(db)
-    return service.update_inventory(inventory_id, payload)
+    return await service.update_inventory(inventory_id, payload)
+
+
+@router.patch("/{inventory_id}/shards")
+async def update_shard_count(
+    inventory_id: str,
+    payload: SellerInventoryShards,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    service = SellerInventoryService(db)
+    return await service.update_shard_count(
+        inventory_id, payload.shard_count, request.state.user.id
+    )
 
 
 @router.delete("/{inventory_id}")
-def delete_inventory(
+async def delete_inventory(
     inventory_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = SellerInventoryService(db)
-    return service.delete_inventory(inventory_id)
+    return await service.delete_inventory(inventory_id)
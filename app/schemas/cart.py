@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, ConfigDict
 
 
@@ -16,5 +18,6 @@ class CartItemResponse(BaseModel):
     image: str
     seller_id: str
     seller_name: str
+    reserved_until: datetime | None = None
 
     model_config = ConfigDict(from_attributes=True)
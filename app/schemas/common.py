@@ -1,6 +1,10 @@
 from pydantic import BaseModel
 
+from app.utils.enums import TotalKind
+
 
 class Page(BaseModel):
     data: list[object]
     total: int
+    total_kind: TotalKind = TotalKind.EXACT
+    next_cursor: str | None = None
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, ConfigDict
 
 from app.schemas.product import ProductOut
+from app.utils.enums import TotalKind
 
 
 class SellerInventoryCreate(BaseModel):
@@ -8,6 +9,10 @@ class SellerInventoryCreate(BaseModel):
     price: float
     quantity: int
 
+
+class SellerInventoryShards(BaseModel):
+    shard_count: int
+
 class SellerInventoryOut(BaseModel):
     id: str
     price: float
@@ -29,6 +34,7 @@ class SellerInventoryDetailResponse(BaseModel):
     id: str
     price: float
     quantity: int
+    shard_count: int = 1
     product_id: str
     product_name: str
     product_image: str
@@ -44,4 +50,6 @@ class SellerInventoryPageResponse(BaseModel):
     size: int
     skip: int
     total_record: int
+    total_kind: TotalKind = TotalKind.EXACT
+    next_cursor: str | None = None
     result: list[SellerInventoryDetailResponse]
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, ConfigDict, Field
 from typing import List
 from datetime import datetime
-from app.utils.enums import OrderStatus
+from app.utils.enums import OrderStatus, TotalKind
 
 
 class OrderItemCreate(BaseModel):
@@ -36,13 +36,29 @@ class OrderResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     total: float
+    item_count: int
+    # only filled in when the listing is requested with include=items
+    items: List[OrderItemResponse] | None = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class OrderBulkStatusUpdate(BaseModel):
+    order_ids: List[str]
+
+
+class OrderStatusResult(BaseModel):
+    id: str
+    status: OrderStatus | None
+    updated: bool
+    detail: str | None = None
+
+
 class OrderPageResponse(BaseModel):
     page: int
     size: int
     skip: int
     total_record: int
+    total_kind: TotalKind = TotalKind.EXACT
+    next_cursor: str | None = None
     result: list[OrderResponse]
@@ -1,6 +1,8 @@
 
 from pydantic import BaseModel, ConfigDict
 
+from app.utils.enums import TotalKind
+
 
 class ProductResponse(BaseModel):
     id: str
@@ -36,6 +38,8 @@ class ProductPageResponse(BaseModel):
     size: int
     skip: int
     total_record: int
+    total_kind: TotalKind = TotalKind.EXACT
+    next_cursor: str | None = None
     result: list[ProductResponse]
 
 
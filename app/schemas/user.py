@@ -1,6 +1,7 @@
 from pydantic import BaseModel, ConfigDict
 
 from app.models.user import RoleEnum
+from app.utils.enums import TotalKind
 
 
 class UserCreate(BaseModel):
@@ -39,6 +40,8 @@ class UserPageResponse(BaseModel):
     size: int
     skip: int
     total_record: int
+    total_kind: TotalKind = TotalKind.EXACT
+    next_cursor: str | None = None
     result: list[UserResponse]
 
 
@@ -1,7 +1,8 @@
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.dependency import transactional
 from app.core.exception import BusinessError
+from app.core.revocation import revocations
 from app.models.user import User
 from app.repository.user_repository import UserRepository
 from app.schemas.user import (
@@ -10,32 +11,44 @@ from app.schemas.user import (
     UserResponse,
     UserUpdateProfile,
 )
-from app.utils import util
-from app.utils.util import create_access_token, verify_password
+from app.services.password_service import password_service
+from app.utils.util import create_access_token
 
 
 class AuthService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = UserRepository(db)
 
-    def authenticate_user(self, username: str, password: str):
-        result = self.repo.find_by_username(username)
-        if not result or not verify_password(password, result.password):
+    async def authenticate_user(self, username: str, password: str):
+        result = await self.repo.find_by_username(username)
+        if not result or not await password_service.verify(password, result.password):
             raise BusinessError("Invalid credentials")
         return UserLoginResponse(
-            access_token=create_access_token({"data": {"user_id": result.id}})
+            access_token=create_access_token(
+                {
+                    "data": {
+                        "user_id": result.id,
+                        "role": result.role.value,
+                        "ver": result.token_version,
+                    }
+                }
+            )
         )
 
-    def get_profile(self, user_id: str):
-        user = self.repo.find_by_id(user_id)
+    async def get_profile(self, user_id: str):
+        user = await self.repo.find_by_id(user_id)
         if not user:
             raise BusinessError("User not found")
         return UserResponse(**user.__dict__)
 
+    async def register_user(self, data: UserCreate):
+        password = await password_service.hash(data.password)
+        return await self.__save_new_user(data, password)
+
     @transactional
-    def register_user(self, data: UserCreate):
-        existing_user = self.repo.find_by_username(data.username)
+    async def __save_new_user(self, data: UserCreate, password: str):
+        existing_user = await self.repo.find_by_username(data.username)
         if existing_user:
             raise BusinessError("User already exists")
         user = User(
@@ -43,15 +56,15 @@ class AuthService:
             address=data.address,
             phone=data.phone,
             username=data.username,
-            password=util.hash_password(data.password),
+            password=password,
             role=data.role,
         )
         self.repo.save(user)
         return JSONResponse(status_code=200, content={"detail": "User created"})
 
     @transactional
-    def update_profile(self, user_id: str, data: UserUpdateProfile):
-        user = self.repo.find_by_id(user_id)
+    async def update_profile(self, user_id: str, data: UserUpdateProfile):
+        user = await self.repo.find_by_id(user_id)
         if not user:
             raise BusinessError("User not found")
         user.username = data.username
@@ -61,11 +74,26 @@ class AuthService:
         self.repo.update(user)
         return UserResponse(**user.__dict__)
 
+    async def change_password(self, user_id: str, old_password: str, new_password: str):
+        current = await self.__get_password(user_id)
+        if not current or not await password_service.verify(old_password, current):
+            raise BusinessError("Invalid credentials")
+        password = await password_service.hash(new_password)
+        return await self.__update_password(user_id, password)
+
+    async def __get_password(self, user_id: str) -> str | None:
+        # a plain read, but from the primary so a password changed moments ago is not checked against a stale copy
+        self.db.info["use_primary"] = True
+        user = await self.repo.find_by_id(user_id)
+        return user.password if user else None
+
     @transactional
-    def change_password(self, user_id: str, old_password: str, new_password: str):
-        user = self.repo.find_by_id(user_id)
-        if not user or not verify_password(old_password, user.password):
+    async def __update_password(self, user_id: str, password: str):
+        user = await self.repo.find_by_id(user_id)
+        if not user:
             raise BusinessError("Invalid credentials")
-        user.password = util.hash_password(new_password)
+        user.password = password
+        user.token_version = (user.token_version or 0) + 1
         self.repo.update(user)
+        revocations.mark(self.db, user_id, user.token_version)
         return JSONResponse(status_code=200, content={"detail": "Password changed"})
@@ -1,49 +1,65 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import config
 from app.core.dependency import transactional
 from app.core.exception import BusinessError
-from app.models.cart import CartItem
-from app.models.order import Order, OrderItem
+from app.models.reservation import StockReservation
 from app.repository.cart_repository import CartRepository
 from app.repository.inventory_repository import SellerInventoryRepository
 from app.repository.order_repository import OrderRepository
+from app.repository.reservation_repository import StockReservationRepository
 from app.schemas.cart import CartItemCreate, CartItemResponse
+from app.services.checkout_pipeline import PendingCheckout, checkout_pipeline
 
 
 class CartService:
-    def __init__(self, db: Session):
+    """
+    Cart operations and checkout.
+    With CART_RESERVATION_ENABLED every cart line holds its quantity for CART_RESERVATION_SECONDS:
+    the held units are taken off the inventory stock right away (so listings show stock net of holds),
+    checkout converts the holds into the order and expired holds are returned by the reservation sweeper.
+    With CHECKOUT_GROUP_COMMIT_ENABLED (and reservations off) checkouts are committed in batches by the checkout pipeline.
+    """
+
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = CartRepository(db)
         self.inventory_repo = SellerInventoryRepository(db)
         self.order_repo = OrderRepository(db)
+        self.reservation_repo = StockReservationRepository(db)
 
-    def list_cart(self, user_id: str) -> list[CartItemResponse]:
-        items = self.repo.find_all(user_id)
+    async def list_cart(self, user_id: str) -> list[CartItemResponse]:
+        items = await self.repo.find_all(user_id)
         return [CartItemResponse(**item._mapping) for item in items]
 
     @transactional
-    def add_to_cart(self, user_id: str, item: CartItemCreate) -> JSONResponse:
-        entity = self.repo.get_by_buyer_id_and_inventory_id(
-            user_id, item.seller_inventory_id
-        )
-        if entity:
-            entity.quantity += item.quantity
-            self.repo.update_cart(entity)
-        else:
-            cart = CartItem(
-                buyer_id=user_id,
-                seller_inventory_id=item.seller_inventory_id,
-                quantity=item.quantity,
-            )
-            self.repo.create_cart(cart)
+    async def add_to_cart(self, user_id: str, item: CartItemCreate) -> JSONResponse:
+        await self.__add_items(user_id, [item])
         return JSONResponse(status_code=201, content={"detail": "Item added to cart"})
 
     @transactional
-    def update_cart_item(
+    async def add_items_to_cart(
+        self, user_id: str, items: list[CartItemCreate]
+    ) -> JSONResponse:
+        if not items:
+            raise BusinessError("No items to add")
+        if len(items) > config.CART_BULK_MAX_ITEMS:
+            raise BusinessError(f"At most {config.CART_BULK_MAX_ITEMS} items can be added at once")
+        # one upsert row per inventory, PostgreSQL refuses ON CONFLICT DO UPDATE on the same row twice
+        if len({item.seller_inventory_id for item in items}) < len(items):
+            raise BusinessError("Duplicate inventory in items")
+        await self.__add_items(user_id, items)
+        return JSONResponse(status_code=201, content={"detail": "Items added to cart"})
+
+    @transactional
+    async def update_cart_item(
         self, cart_item_id: str, quantity: int, user_id: str
     ) -> JSONResponse:
-        cart_item = self.repo.get_by_id(cart_item_id)
+        cart_item = await self.repo.get_by_id(cart_item_id)
         if not cart_item:
             raise BusinessError("Cart item not found")
 
@@ -51,62 +67,182 @@ class CartService:
             raise BusinessError("Unauthorized to update this cart item")
 
         if quantity <= 0:
-            self.repo.delete_cart_item(cart_item)
+            await self.repo.delete_cart_item(cart_item)
         else:
             cart_item.quantity = quantity
             self.repo.update_cart(cart_item)
+        if config.CART_RESERVATION_ENABLED:
+            await self.__reserve(user_id, {cart_item.seller_inventory_id: max(quantity, 0)})
 
         return JSONResponse(status_code=200, content={"detail": "Cart item updated"})
 
     @transactional
-    def clear_cart(self, user_id: str) -> JSONResponse:
-        self.repo.clear_cart(user_id)
+    async def clear_cart(self, user_id: str) -> JSONResponse:
+        await self.repo.clear_cart(user_id)
+        if config.CART_RESERVATION_ENABLED:
+            await self.__release(user_id)
         return JSONResponse(status_code=200, content={"detail": "Cart cleared"})
 
     @transactional
-    def delete_cart_item(self, cart_item_id: str, user_id: str) -> JSONResponse:
-        cart_item = self.repo.get_by_id(cart_item_id)
+    async def delete_cart_item(self, cart_item_id: str, user_id: str) -> JSONResponse:
+        cart_item = await self.repo.get_by_id(cart_item_id)
         if not cart_item:
             raise BusinessError("Cart item not found")
 
         if cart_item.buyer_id != user_id:
             raise BusinessError("Unauthorized to delete this cart item")
 
-        self.repo.delete_cart_item(cart_item)
+        await self.repo.delete_cart_item(cart_item)
+        if config.CART_RESERVATION_ENABLED:
+            await self.__release(user_id, [cart_item.seller_inventory_id])
         return JSONResponse(status_code=200, content={"detail": "Cart item deleted"})
 
+    async def checkout(self, user_id: str):
+        # the pipeline commits in its own transaction, a request that already wrote (e.g. claimed an
+        # Idempotency-Key) checks out in its own transaction so both commit or roll back together
+        if (
+            config.CHECKOUT_GROUP_COMMIT_ENABLED
+            and not config.CART_RESERVATION_ENABLED
+            and not self.db.info.get("wrote")
+        ):
+            return await self.__checkout_grouped(user_id)
+        return await self.__checkout(user_id)
+
     @transactional
-    def checkout(self, user_id: str):
-        items = self.repo.find_all(user_id)
+    async def __checkout(self, user_id: str):
+        items = await self.repo.find_all(user_id)
         if not items:
             raise BusinessError("Cart is empty")
 
-        orders_by_seller = {}
+        quantities = self.__quantities(items)
+        if config.CART_RESERVATION_ENABLED:
+            # held units are already off the stock, only the rest (e.g. expired holds) is taken now
+            held = await self.reservation_repo.release(user_id)
+            for inv_id, quantity in held.items():
+                quantities[inv_id] = quantities.get(inv_id, 0) - quantity
+        await self.__adjust_stock(quantities)
+        orders, order_items = self.__build_orders(user_id, items)
+        await self.order_repo.create_orders_with_items(orders, order_items)
+        await self.repo.clear_cart(user_id)
 
-        for item in items:
-            inv = self.inventory_repo.get_by_id_for_update(item.inventory_id)
-            if not inv:
-                raise BusinessError("Inventory not found")
+        return JSONResponse(status_code=201, content={"detail": "Order created"})
 
-            if inv.quantity < item.quantity:
-                raise BusinessError("Stock not enough")
+    async def __checkout_grouped(self, user_id: str):
+        # the cart is read here, the stock, orders and cart lines are written by the pipeline's batch transaction
+        self.db.info["use_primary"] = True
+        items = await self.repo.find_all(user_id)
+        if not items:
+            raise BusinessError("Cart is empty")
 
-            inv.quantity -= item.quantity
+        orders, order_items = self.__build_orders(user_id, items)
+        # end the read transaction so the connection goes back to the pool while the checkout waits,
+        # otherwise enough waiting checkouts leave the batch transactions without a connection
+        await self.db.commit()
+        await checkout_pipeline.submit(
+            PendingCheckout(
+                user_id,
+                {item.id: item.quantity for item in items},
+                self.__quantities(items),
+                orders,
+                order_items,
+            )
+        )
+        return JSONResponse(status_code=201, content={"detail": "Order created"})
 
-            if inv.seller_id not in orders_by_seller:
-                orders_by_seller[inv.seller_id] = Order(
-                    buyer_id=user_id, seller_id=inv.seller_id, items=[]
-                )
+    @staticmethod
+    def __quantities(items) -> dict[str, int]:
+        quantities = {}
+        for item in items:
+            quantities[item.inventory_id] = quantities.get(item.inventory_id, 0) + item.quantity
+        return quantities
 
-            orders_by_seller[inv.seller_id].items.append(
-                OrderItem(
-                    seller_inventory_id=inv.id,
-                    quantity=item.quantity,
-                    price_at_purchase=inv.price,
-                )
+    @staticmethod
+    def __build_orders(user_id: str, items) -> tuple[list[dict], list[dict]]:
+        """Builds one order per seller (with its total and item count) and one order item per cart line."""
+        orders_by_seller = {}
+        order_items = []
+
+        for item in items:
+            if item.seller_id not in orders_by_seller:
+                orders_by_seller[item.seller_id] = {
+                    "id": str(uuid4()),
+                    "buyer_id": user_id,
+                    "seller_id": item.seller_id,
+                    "total": 0,
+                    "item_count": 0,
+                }
+            order = orders_by_seller[item.seller_id]
+            order["total"] += item.quantity * item.price
+            order["item_count"] += item.quantity
+
+            order_items.append(
+                {
+                    "id": str(uuid4()),
+                    "order_id": order["id"],
+                    "seller_inventory_id": item.inventory_id,
+                    "quantity": item.quantity,
+                    "price_at_purchase": item.price,
+                    "product_name": item.product_name,
+                    "product_image": item.image,
+                    "product_description": item.product_description,
+                }
             )
+        return list(orders_by_seller.values()), order_items
+
+    async def __add_items(self, user_id: str, items: list[CartItemCreate]) -> None:
+        quantities = {item.seller_inventory_id: item.quantity for item in items}
+        totals = await self.repo.add_items(user_id, quantities)
+        if config.CART_RESERVATION_ENABLED:
+            await self.__reserve(user_id, totals)
+
+    async def __reserve(self, user_id: str, quantities: dict[str, int]) -> None:
+        """Sets the buyer's holds to `quantities[inventory_id]` units and restarts their expiry."""
+        holds = {
+            hold.seller_inventory_id: hold
+            for hold in await self.reservation_repo.get_for_update(user_id, list(quantities))
+        }
+        held = {inventory_id: hold.quantity for inventory_id, hold in holds.items()}
+        await self.__adjust_stock(
+            {
+                inventory_id: quantity - held.get(inventory_id, 0)
+                for inventory_id, quantity in quantities.items()
+            }
+        )
 
-        self.order_repo.create_order_with_items(list(orders_by_seller.values()))
-        self.repo.clear_cart(user_id)
+        expires_at = datetime.now() + timedelta(seconds=config.CART_RESERVATION_SECONDS)
+        for inventory_id, quantity in quantities.items():
+            hold = holds.get(inventory_id)
+            if quantity <= 0:
+                if hold:
+                    await self.db.delete(hold)
+            elif hold:
+                hold.quantity = quantity
+                hold.expires_at = expires_at
+            else:
+                self.reservation_repo.save(
+                    StockReservation(
+                        buyer_id=user_id,
+                        seller_inventory_id=inventory_id,
+                        quantity=quantity,
+                        expires_at=expires_at,
+                    )
+                )
 
-        return JSONResponse(status_code=201, content={"detail": "Order created"})
+    async def __release(self, user_id: str, inventory_ids: list[str] | None = None) -> None:
+        released = await self.reservation_repo.release(user_id, inventory_ids)
+        if released:
+            await self.inventory_repo.increment_stock(released)
+
+    async def __adjust_stock(self, quantities: dict[str, int]) -> None:
+        """Takes positive quantities off the stock (all or nothing) and puts negative ones back."""
+        take = {inv_id: qty for inv_id, qty in quantities.items() if qty > 0}
+        give = {inv_id: -qty for inv_id, qty in quantities.items() if qty < 0}
+        if take:
+            taken = await self.inventory_repo.decrement_stock(take)
+            if len(taken) < len(take):
+                existing = await self.inventory_repo.find_existing_ids(take)
+                if len(existing) < len(take):
+                    raise BusinessError("Inventory not found")
+                raise BusinessError("Stock not enough")
+        if give:
+            await self.inventory_repo.increment_stock(give)
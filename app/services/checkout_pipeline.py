@@ -0,0 +1,212 @@
+import asyncio
+
+from app.core import config
+from app.core.cache import recent_writers
+from app.core.exception import SERVICE_BUSY, BusinessError
+from app.database.session import SessionLocal
+from app.repository.cart_repository import CartRepository
+from app.repository.inventory_repository import SellerInventoryRepository
+from app.repository.order_repository import OrderRepository
+
+
+class PendingCheckout:
+    """
+    A buyer's checkout waiting in the pipeline: the cart lines it consumes (quantity by cart id, as read by
+    the request), the stock it takes and the order rows it inserts, plus the future its caller is waiting on.
+    """
+
+    def __init__(
+        self,
+        buyer_id: str,
+        cart_lines: dict[str, int],
+        quantities: dict[str, int],
+        orders: list[dict],
+        order_items: list[dict],
+    ):
+        self.buyer_id = buyer_id
+        self.cart_lines = cart_lines
+        self.quantities = quantities
+        self.orders = orders
+        self.order_items = order_items
+        self.batched = False
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class CheckoutPipeline:
+    """
+    CheckoutPipeline group-commits checkouts, so hot inventory rows are locked once per batch instead of once per buyer.
+    Features:
+    - Checkouts are queued on one of `shards` in-process queues, chosen by their smallest inventory id,
+      so buyers of the same hot inventory end up in the same queue.
+    - Each queue has one worker that takes up to `max_batch` queued checkouts (everything that arrived while
+      the previous batch was committing) and runs them in a single transaction: one locking SELECT of the
+      inventories in id order, one bulk stock UPDATE, bulk order/order item INSERTs and one cart DELETE.
+    - Stock is handed out in arrival order against the locked quantities, a checkout that does not fit is
+      rejected on its own ("Stock not enough") without failing the rest of the batch, so nothing is oversold.
+    - The cart lines are locked in the batch transaction, a checkout whose lines were already checked out
+      (e.g. by the same buyer in an earlier batch) or changed since the request read them is rejected.
+    - A buyer queued twice in the same batch only checks out once, the repeat finds an empty cart.
+    - If the batch transaction fails, every checkout in it fails with the same error, the worker keeps going.
+    - A queued checkout waits at most `timeout` seconds for a batch to take it, then it is dropped and the caller
+      gets 503. Once taken, the caller waits for the batch outcome, so a 503 never hides a committed order.
+    - Reports queued, committed and rejected checkouts through `stats()`.
+    Args:
+        shards (int): The number of queues (and workers).
+        max_batch (int): The maximum number of checkouts committed in one transaction.
+        timeout (float): The seconds a checkout waits in the queue before giving up with 503.
+    """
+
+    def __init__(self, shards: int, max_batch: int, timeout: float):
+        self.shards = shards
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._queues: list[asyncio.Queue] | None = None
+        self._workers: list[asyncio.Task] = []
+        self.batches = 0
+        self.committed = 0
+        self.rejected = 0
+        self.failed = 0
+
+    async def submit(self, checkout: PendingCheckout) -> None:
+        """Queues the checkout and waits until its batch is committed, raising the checkout's own error if rejected."""
+        if self._queues is None:
+            self._queues = [asyncio.Queue() for _ in range(self.shards)]
+            self._workers = [asyncio.create_task(self._work(queue)) for queue in self._queues]
+        shard = hash(min(checkout.quantities)) % self.shards
+        self._queues[shard].put_nowait(checkout)
+        try:
+            await asyncio.wait_for(asyncio.shield(checkout.future), self.timeout)
+        except asyncio.TimeoutError:
+            if checkout.batched:
+                # a running batch already holds it and will commit or reject it, wait for that outcome
+                await checkout.future
+                return
+            # still queued, the batch that picks it up skips a done future
+            checkout.future.cancel()
+            raise SERVICE_BUSY
+
+    def stats(self) -> dict:
+        return {
+            "enabled": config.CHECKOUT_GROUP_COMMIT_ENABLED,
+            "shards": self.shards,
+            "max_batch": self.max_batch,
+            "timeout": self.timeout,
+            "queue_depth": sum(queue.qsize() for queue in self._queues or []),
+            "batches": self.batches,
+            "committed": self.committed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+        }
+
+    async def shutdown(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queues = None
+        self._workers = []
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            for checkout in batch:
+                checkout.batched = True
+            try:
+                await self._commit(batch)
+            except Exception as e:
+                # e.g. the session could not be opened or closed, fail the batch but keep serving the queue
+                self.failed += len(batch)
+                for checkout in batch:
+                    if not checkout.future.done():
+                        checkout.future.set_exception(e)
+
+    async def _commit(self, batch: list[PendingCheckout]) -> None:
+        db = SessionLocal(info={"use_primary": True, "wrote": True})
+        try:
+            inventories = SellerInventoryRepository(db)
+            carts = CartRepository(db)
+            stock = await inventories.get_stock_for_update(
+                {inv_id for checkout in batch for inv_id in checkout.quantities}
+            )
+            lines = await carts.lock_by_ids(
+                [cart_id for checkout in batch for cart_id in checkout.cart_lines]
+            )
+
+            accepted: list[PendingCheckout] = []
+            rejected: dict[PendingCheckout, BusinessError] = {}
+            buyers = set()
+            for checkout in batch:
+                if checkout.future.done():
+                    continue
+                error = self._allocate(checkout, stock, lines, buyers)
+                if error:
+                    rejected[checkout] = error
+                else:
+                    accepted.append(checkout)
+                    buyers.add(checkout.buyer_id)
+
+            if accepted:
+                taken = {}
+                for checkout in accepted:
+                    for inv_id, quantity in checkout.quantities.items():
+                        taken[inv_id] = taken.get(inv_id, 0) + quantity
+                # the inventories are locked and allocated above, a short result means the stock moved anyway
+                if len(await inventories.decrement_stock(taken)) < len(taken):
+                    raise BusinessError("Stock not enough")
+                await OrderRepository(db).create_orders_with_items(
+                    [order for checkout in accepted for order in checkout.orders],
+                    [item for checkout in accepted for item in checkout.order_items],
+                )
+                cart_ids = [cart_id for checkout in accepted for cart_id in checkout.cart_lines]
+                if await carts.delete_by_ids(cart_ids) < len(cart_ids):
+                    raise BusinessError("Cart has changed, please retry")
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            self.failed += len(batch)
+            for checkout in batch:
+                if not checkout.future.done():
+                    checkout.future.set_exception(e)
+            return
+        finally:
+            await db.close()
+
+        self.batches += 1
+        self.committed += len(accepted)
+        self.rejected += len(rejected)
+        for checkout in accepted:
+            # the batch session has no single user, mark the buyers before their callers respond
+            recent_writers.set(checkout.buyer_id, True)
+            if not checkout.future.done():
+                checkout.future.set_result(None)
+        for checkout, error in rejected.items():
+            if not checkout.future.done():
+                checkout.future.set_exception(error)
+
+    def _allocate(
+        self,
+        checkout: PendingCheckout,
+        stock: dict[str, int],
+        lines: dict[str, int],
+        buyers: set[str],
+    ) -> BusinessError | None:
+        """Takes the checkout's quantities off `stock` when all of them fit, returns the rejection otherwise."""
+        if checkout.buyer_id in buyers or not any(cart_id in lines for cart_id in checkout.cart_lines):
+            return BusinessError("Cart is empty")
+        if any(lines.get(cart_id) != quantity for cart_id, quantity in checkout.cart_lines.items()):
+            return BusinessError("Cart has changed, please retry")
+        if any(inv_id not in stock for inv_id in checkout.quantities):
+            return BusinessError("Inventory not found")
+        if any(stock[inv_id] < quantity for inv_id, quantity in checkout.quantities.items()):
+            return BusinessError("Stock not enough")
+        for inv_id, quantity in checkout.quantities.items():
+            stock[inv_id] -= quantity
+        return None
+
+
+checkout_pipeline = CheckoutPipeline(
+    config.CHECKOUT_GROUP_SHARDS,
+    config.CHECKOUT_GROUP_MAX_BATCH,
+    config.CHECKOUT_GROUP_TIMEOUT_SECONDS,
+)
@@ -1,5 +1,6 @@
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import config
 from app.core.dependency import transactional
 from app.core.exception import BusinessError
 from app.models.inventory import SellerInventory
@@ -14,12 +15,12 @@ from app.schemas.product import ProductDropListResponse
 
 
 class SellerInventoryService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = SellerInventoryRepository(db)
         self.product_repo = ProductRepository(db)
 
-    def list_all_inventory(
+    async def list_all_inventory(
         self,
         page: int,
         size: int,
@@ -27,38 +28,42 @@ class SellerInventoryService:
         order: str,
         search: str | None,
         seller_id: str | None = None,
+        cursor: str | None = None,
     ) -> SellerInventoryPageResponse:
         skip = (page - 1) * size
         limit = size
-        entities = self.repo.find_all_pagination(
-            skip, limit, sort_by, order, search, seller_id
+        entities = await self.repo.find_all_pagination(
+            skip, limit, sort_by, order, search, seller_id, cursor
         )
         return SellerInventoryPageResponse(
             page=page,
             size=size,
             skip=skip,
             total_record=entities.total,
+            total_kind=entities.total_kind,
+            next_cursor=entities.next_cursor,
             result=entities.data,
         )
 
-    def get_product_list(self) -> list[ProductDropListResponse]:
-        entities = self.product_repo.find_all()
+    async def get_product_list(self) -> list[ProductDropListResponse]:
+        entities = await self.product_repo.find_all()
         return [ProductDropListResponse(**entity._mapping) for entity in entities]
 
-    def get_inventory(self, inventory_id: str) -> SellerInventoryResponse:
-        entity = self.repo.get_by_id(inventory_id)
+    async def get_inventory(self, inventory_id: str) -> SellerInventoryResponse:
+        entity = await self.repo.get_by_id(inventory_id)
         if entity is None:
             raise BusinessError("Record Not Found")
         return SellerInventoryResponse(**entity.__dict__)
 
     @transactional
-    def add_inventory(
+    async def add_inventory(
         self, data: SellerInventoryCreate, seller_id: str
     ) -> SellerInventoryResponse:
-        entity = self.repo.get_by_product_and_seller_for_update(seller_id, data.product_id)
+        entity = await self.repo.get_by_product_and_seller_for_update(seller_id, data.product_id)
         if entity:
-            entity.quantity = data.quantity
+            await self.repo.set_stock(entity, data.quantity)
             entity.price = data.price
+            entity.delete = False
             self.repo.update(entity)
         else:
             entity = SellerInventory(
@@ -71,20 +76,32 @@ class SellerInventoryService:
         return JSONResponse(status_code=201, content={"detail": "Inventory created"})
 
     @transactional
-    def update_inventory(self, inventory_id: str, data: SellerInventoryCreate):
-        entity = self.repo.get_by_id(inventory_id)
+    async def update_inventory(self, inventory_id: str, data: SellerInventoryCreate):
+        entity = await self.repo.get_by_id(inventory_id)
         if entity is None:
             raise BusinessError("Record Not Found")
         if data.quantity < 0:
             raise BusinessError("Quantity cannot be negative")
-        entity.quantity = data.quantity
+        await self.repo.set_stock(entity, data.quantity)
         entity.price = data.price
         self.repo.update(entity)
         return JSONResponse(status_code=200, content={"detail": "Inventory updated"})
 
     @transactional
-    def delete_inventory(self, inventory_id: str):
-        entity = self.repo.get_by_id(inventory_id)
+    async def update_shard_count(self, inventory_id: str, shard_count: int, seller_id: str):
+        if not 1 <= shard_count <= config.STOCK_MAX_SHARDS:
+            raise BusinessError(f"Shard count must be between 1 and {config.STOCK_MAX_SHARDS}")
+        entity = await self.repo.get_by_id_for_update(inventory_id)
+        if entity is None:
+            raise BusinessError("Record Not Found")
+        if entity.seller_id != seller_id:
+            raise BusinessError("Unauthorized to update this inventory")
+        await self.repo.set_shard_count(entity, shard_count)
+        return JSONResponse(status_code=200, content={"detail": "Inventory shards updated"})
+
+    @transactional
+    async def delete_inventory(self, inventory_id: str):
+        entity = await self.repo.get_by_id(inventory_id)
         if entity is None:
             raise BusinessError("Record Not Found")
         self.repo.delete(entity)
@@ -1,5 +1,6 @@
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import config
 from app.core.dependency import transactional
 from app.core.exception import BusinessError
 from app.models.user import User
@@ -11,6 +12,7 @@ from app.schemas.order import (
     OrderPageResponse,
     OrderResponse,
     OrderStatus,
+    OrderStatusResult,
 )
 
 from app.utils import util
@@ -18,61 +20,100 @@ from app.utils.enums import RoleEnum
 
 
 class OrderService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = OrderRepository(db)
         self.repo_order_item = OrderItemRepository(db)
         self.repo_seller_inventory = SellerInventoryRepository(db)
 
-    def list_orders(self, page: int, size: int, sort_by: str, order: str, user: User):
+    async def list_orders(
+        self,
+        page: int,
+        size: int,
+        sort_by: str,
+        order: str,
+        user: User,
+        cursor: str | None = None,
+        include: str | None = None,
+    ):
+        include_items = self.__include_items(include)
         skip = (page - 1) * size
         limit = size
         if user.role == RoleEnum.SELLER:
-            result = self.repo.find_orders_by_seller(
-                skip, limit, sort_by, order, user.id
+            result = await self.repo.find_orders_by_seller(
+                skip, limit, sort_by, order, user.id, cursor=cursor
             )
         elif user.role == RoleEnum.BUYER:
-            result = self.repo.find_orders_by_buyer(
-                skip, limit, sort_by, order, user.id
+            result = await self.repo.find_orders_by_buyer(
+                skip, limit, sort_by, order, user.id, cursor=cursor
             )
         return OrderPageResponse(
             page=page,
             size=size,
             skip=skip,
             total_record=result.total,
-            result=result.data,
+            total_kind=result.total_kind,
+            next_cursor=result.next_cursor,
+            result=await self.__with_items(result.data) if include_items else result.data,
         )
 
-    def get_order_history(
-        self, user: User, page: int, size: int, sort_by: str, order: str
+    async def get_order_history(
+        self,
+        user: User,
+        page: int,
+        size: int,
+        sort_by: str,
+        order: str,
+        cursor: str | None = None,
+        include: str | None = None,
     ):
+        include_items = self.__include_items(include)
         skip = (page - 1) * size
         limit = size
         if user.role == RoleEnum.SELLER:
-            result = self.repo.find_orders_by_seller(
-                skip, limit, sort_by, order, user.id, True
+            result = await self.repo.find_orders_by_seller(
+                skip, limit, sort_by, order, user.id, True, cursor
             )
         elif user.role == RoleEnum.BUYER:
-            result = self.repo.find_orders_by_buyer(
-                skip, limit, sort_by, order, user.id, True
+            result = await self.repo.find_orders_by_buyer(
+                skip, limit, sort_by, order, user.id, True, cursor
             )
         return OrderPageResponse(
             page=1,
             size=100,
             skip=0,
             total_record=result.total,
-            result=result.data,
+            total_kind=result.total_kind,
+            next_cursor=result.next_cursor,
+            result=await self.__with_items(result.data) if include_items else result.data,
         )
 
-    def get_order_items(self, order_id: str) -> list[OrderItemResponse]:
-        result = self.repo_order_item.find_orders_items(order_id)
+    @staticmethod
+    def __include_items(include: str | None) -> bool:
+        includes = {value.strip() for value in include.split(",")} if include else set()
+        if includes - {"items"}:
+            raise BusinessError("Only include=items is supported")
+        return "items" in includes
+
+    async def __with_items(self, orders: list) -> list[OrderResponse]:
+        # one query for the items of the whole page, grouped here, instead of one request per order
+        items: dict[str, list[OrderItemResponse]] = {order.id: [] for order in orders}
+        for item in await self.repo_order_item.find_items_by_order_ids(list(items)):
+            items[item.order_id].append(OrderItemResponse(**item._mapping))
+        return [
+            OrderResponse(**order._mapping, items=items[order.id]) for order in orders
+        ]
+
+    async def get_order_items(self, order_id: str) -> list[OrderItemResponse]:
+        result = await self.repo_order_item.find_orders_items(order_id)
         return [OrderItemResponse(**item._mapping) for item in result]
 
     @transactional
-    def update_order_status(
+    async def update_order_status(
         self, order_id: str, new_status: OrderStatus, user: User | None
     ) -> OrderResponse:
-        order = self.repo.get_order_by_id(order_id)
+        # locked, so a concurrent auto-cancel or transition cannot change the status read below
+        order = await self.repo.get_order_by_id(order_id, for_update=True)
         if order is None:
             raise BusinessError("Record Not Found")
 
@@ -91,12 +132,62 @@ class OrderService:
             new_status == OrderStatus.CANCELLED
             or new_status == OrderStatus.AUTO_CANCELLED
         ):
+            quantities = {}
             for item in updated_order.items:
-                inv = self.repo_seller_inventory.get_by_id_for_update(
-                    item.seller_inventory_id
+                quantities[item.seller_inventory_id] = (
+                    quantities.get(item.seller_inventory_id, 0) + item.quantity
                 )
-                if inv is None:
-                    raise BusinessError("Inventory not found")
-                inv.quantity += item.quantity
-                self.repo_seller_inventory.update(inv)
+            restored = await self.repo_seller_inventory.increment_stock(quantities)
+            if len(restored) < len(quantities):
+                raise BusinessError("Inventory not found")
         return JSONResponse(status_code=200, content="Order status updated")
+
+    @transactional
+    async def update_orders_status(
+        self, order_ids: list[str], new_status: OrderStatus, user: User
+    ) -> list[OrderStatusResult]:
+        """
+        Moves many orders to `new_status` at once.
+        Features:
+        - The orders are locked and checked in one SELECT, with the same rules as `update_order_status`.
+        - Orders that pass are updated with one UPDATE, cancelled orders give their stock back with one UPDATE.
+        - Orders that fail are left untouched and reported with the reason, they do not fail the rest.
+        Returns:
+            list[OrderStatusResult]: One result per requested order id, in request order.
+        """
+        order_ids = list(dict.fromkeys(order_ids))
+        if not order_ids:
+            raise BusinessError("No orders given")
+        if len(order_ids) > config.ORDER_BULK_MAX_IDS:
+            raise BusinessError(f"At most {config.ORDER_BULK_MAX_IDS} orders can be updated at once")
+
+        states = await self.repo.find_states_for_update(order_ids)
+        results = []
+        accepted = []
+        for order_id in order_ids:
+            detail = None
+            status = None
+            if order_id not in states:
+                detail = "Record Not Found"
+            else:
+                status, buyer_id, seller_id = states[order_id]
+                owner_id = seller_id if user.role == RoleEnum.SELLER else buyer_id
+                if not util.valid_status_transition(status, new_status.value):
+                    detail = "Invalid order status transition"
+                elif owner_id != user.id:
+                    detail = "Unauthorized to update this order"
+            if detail is None:
+                accepted.append(order_id)
+                status = new_status
+            results.append(
+                OrderStatusResult(id=order_id, status=status, updated=detail is None, detail=detail)
+            )
+
+        if accepted:
+            await self.repo.update_orders_status(accepted, new_status)
+            if new_status in (OrderStatus.CANCELLED, OrderStatus.AUTO_CANCELLED):
+                quantities = await self.repo.sum_item_quantities(accepted)
+                restored = await self.repo_seller_inventory.increment_stock(quantities)
+                if len(restored) < len(quantities):
+                    raise BusinessError("Inventory not found")
+        return results
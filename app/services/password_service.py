@@ -0,0 +1,86 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from app.core import config
+from app.core.exception import SERVICE_BUSY
+from app.utils import util
+
+
+class PasswordService:
+    """
+    PasswordService runs bcrypt hashing and verification off the event loop.
+    Features:
+    - Hashes run in a process pool of `workers` processes (the default thread pool when `workers` is 0).
+      The processes are spawned, not forked, since forking a process that runs threads and holds
+      pooled connections can deadlock the child. `shutdown()` stops them, it runs on app and worker shutdown.
+    - At most `max_concurrency` hashes run at once, the rest wait in a queue.
+    - Callers that wait longer than `queue_timeout` seconds are rejected with SERVICE_BUSY.
+    - Reports queue depth, running and rejected hashes through `stats()`.
+    Args:
+        workers (int): The number of worker processes.
+        max_concurrency (int): The maximum number of hashes running at once.
+        queue_timeout (float): The maximum time to wait for a free slot, in seconds.
+    """
+
+    def __init__(self, workers: int, max_concurrency: int, queue_timeout: float):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self.waiting = 0
+        self.running = 0
+        self.rejected = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(util.hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(util.verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.waiting,
+            "running": self.running,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise SERVICE_BUSY
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+
+password_service = PasswordService(
+    config.PASSWORD_HASH_WORKERS,
+    config.PASSWORD_HASH_MAX_CONCURRENCY,
+    config.PASSWORD_HASH_QUEUE_TIMEOUT,
+)
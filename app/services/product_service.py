@@ -1,7 +1,7 @@
 import os
 from fastapi import UploadFile
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependency import transactional
 from app.core.exception import BusinessError
@@ -19,31 +19,41 @@ from app.utils import util
 
 
 class ProductService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = ProductRepository(db)
         self.inventory_repo = SellerInventoryRepository(db)
 
-    def get_paginated(
-        self, page: int, size: int, sort_by: str, order: str, search: str | None = None
+    async def get_paginated(
+        self,
+        page: int,
+        size: int,
+        sort_by: str,
+        order: str,
+        search: str | None = None,
+        cursor: str | None = None,
     ) -> ProductPageResponse:
         skip = (page - 1) * size
         limit = size
-        result = self.repo.find_all_paginated(skip, limit, sort_by, order, search)
+        result = await self.repo.find_all_paginated(
+            skip, limit, sort_by, order, search, cursor
+        )
         return ProductPageResponse(
             page=page,
             size=size,
             skip=skip,
             total_record=result.total,
+            total_kind=result.total_kind,
+            next_cursor=result.next_cursor,
             result=result.data,
         )
 
-    def get_landing_page(self, limit: int) -> list[ProductLandingPage]:
-        result = self.repo.find_top_products(limit)
+    async def get_landing_page(self, limit: int) -> list[ProductLandingPage]:
+        result = await self.repo.find_top_products(limit)
         return [ProductLandingPage(**item._mapping) for item in result]
 
-    def get_product_by_id(self, product_id: str) -> ProductResponse:
-        entity = self.repo.find_by_id(product_id)
+    async def get_product_by_id(self, product_id: str) -> ProductResponse:
+        entity = await self.repo.find_by_id(product_id)
         if entity is None:
             raise BusinessError("Record Not Found")
         return ProductResponse(**entity.__dict__)
@@ -62,7 +72,7 @@ class ProductService:
 
     @transactional
     async def update_product(self, data: ProductUpdate, image: UploadFile | None):
-        entity = self.repo.find_by_id(data.id)
+        entity = await self.repo.find_by_id(data.id)
         if entity is None:
             raise BusinessError("Record Not Found")
 
@@ -76,12 +86,12 @@ class ProductService:
         return JSONResponse(status_code=200, content={"detail": "Product updated"})
 
     @transactional
-    def delete_product(self, product_id: str):
-        entity = self.repo.find_by_id(product_id)
+    async def delete_product(self, product_id: str):
+        entity = await self.repo.find_by_id(product_id)
         if entity is None:
             raise BusinessError("Record Not Found")
         if entity.image and os.path.exists(entity.image):
             os.remove(entity.image)
         self.repo.delete(entity)
-        self.inventory_repo.delete_by_product_id(product_id)
+        await self.inventory_repo.delete_by_product_id(product_id)
         return JSONResponse(status_code=200, content={"detail": "Product deleted"})
@@ -1,35 +1,50 @@
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.dependency import transactional
 from app.core.exception import BusinessError
+from app.core.revocation import revocations
 from app.models.user import User
 from app.repository.user_repository import UserRepository
 from app.schemas.user import UserPageResponse, UserResponse, UserCreate
-from app.utils import util
+from app.services.password_service import password_service
 
 
 class UserService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = UserRepository(db)
 
-    def get_paginated(
-        self, page: int, size: int, sort_by: str, order: str, search: str | None = None
+    async def get_paginated(
+        self,
+        page: int,
+        size: int,
+        sort_by: str,
+        order: str,
+        search: str | None = None,
+        cursor: str | None = None,
     ) -> UserPageResponse:
         skip = (page - 1) * size
         limit = size
-        result = self.repo.find_all_paginated(skip, limit, sort_by, order, search)
+        result = await self.repo.find_all_paginated(
+            skip, limit, sort_by, order, search, cursor
+        )
         return UserPageResponse(
             page=page,
             size=size,
             skip=skip,
             total_record=result.total,
+            total_kind=result.total_kind,
+            next_cursor=result.next_cursor,
             result=result.data,
         )
 
+    async def insert_user(self, data: UserCreate) -> UserResponse:
+        password = await password_service.hash(data.password)
+        return await self.__save_new_user(data, password)
+
     @transactional
-    def insert_user(self, data: UserCreate) -> UserResponse:
-        entity = self.repo.find_by_username(data.username)
+    async def __save_new_user(self, data: UserCreate, password: str) -> UserResponse:
+        entity = await self.repo.find_by_username(data.username)
         if entity is not None:
             raise BusinessError("User already exists")
         user = User(
@@ -37,16 +52,17 @@ class UserService:
             address=data.address,
             phone=data.phone,
             username=data.username,
-            password=util.hash_password(data.password),
+            password=password,
             role=data.role,
         )
         self.repo.save(user)
         return JSONResponse(status_code=201, content={"detail": "User created"})
 
     @transactional
-    def delete_user(self, user_id: str) -> dict:
-        entity = self.repo.find_by_id(user_id)
+    async def delete_user(self, user_id: str) -> dict:
+        entity = await self.repo.find_by_id(user_id)
         if entity is None:
             raise BusinessError("Record Not Found")
         self.repo.delete(entity)
+        revocations.mark_deleted(self.db, user_id)
         return JSONResponse(status_code=201, content={"detail": "User deleted"})
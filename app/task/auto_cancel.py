@@ -1,37 +1,66 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.interval import IntervalTrigger
-from datetime import datetime
-import atexit
+from datetime import datetime, timedelta
+from time import perf_counter
 
+from app.core import config
+from app.database.lock import try_leader_lock
 from app.database.session import SessionLocal
-from datetime import timedelta
+from app.repository.common import db_time_ago
+from app.repository.inventory_repository import SellerInventoryRepository
+from app.repository.order_repository import OrderRepository
 
-from app.models.order import Order
-from app.utils.enums import OrderStatus
+# counters of the auto-cancel job in this worker, served by /secured/internal/jobs
+auto_cancel_stats = {
+    "runs": 0,
+    "skipped_not_leader": 0,
+    "cancelled_total": 0,
+    "last_cancelled": 0,
+    "last_run_at": None,
+    "last_duration_ms": None,
+    "lag_seconds": 0.0,
+}
 
 
-def auto_cancel_pending():
-    db = SessionLocal()
+async def auto_cancel_pending():
+    """
+    Auto-cancels PENDING orders older than AUTO_CANCEL_AFTER_HOURS and puts their stock back.
+    Orders are cancelled in chunks of AUTO_CANCEL_BATCH with one UPDATE ... RETURNING each,
+    each chunk restoring the stock of its items with one UPDATE and committing on its own.
+    Every chunk takes the "auto_cancel" advisory lock first, so with several workers only one does the scan
+    and the others return right away.
+    `lag_seconds` is how long the oldest overdue order had been waiting past the threshold when the run started.
+    """
+    db = SessionLocal(info={"use_primary": True})
+    started = perf_counter()
     try:
-        threshold = datetime.now() - timedelta(hours=24)
-        pending = (
-            db.query(Order)
-            .filter(Order.status == OrderStatus.PENDING, Order.created_at < threshold)
-            .all()
-        )
-        for o in pending:
-            o.status = OrderStatus.AUTO_CANCELLED
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        print(f"[Scheduler] Error auto-cancelling: {e}")
-    finally:
-        db.close()
+        orders = OrderRepository(db)
+        inventories = SellerInventoryRepository(db)
+        threshold = db_time_ago(db, timedelta(hours=config.AUTO_CANCEL_AFTER_HOURS))
+        if not await try_leader_lock(db, "auto_cancel"):
+            auto_cancel_stats["skipped_not_leader"] += 1
+            return
+        auto_cancel_stats["lag_seconds"] = await orders.find_pending_lag_seconds(threshold)
 
+        cancelled = 0
+        while True:
+            order_ids = await orders.auto_cancel_pending(threshold, config.AUTO_CANCEL_BATCH)
+            if not order_ids:
+                break
+            await inventories.increment_stock(await orders.sum_item_quantities(order_ids))
+            await db.commit()
+            cancelled += len(order_ids)
+            # the lock ended with the chunk's transaction, stop if another worker took over
+            if not await try_leader_lock(db, "auto_cancel"):
+                break
+        await db.commit()
 
-def start_scheduler():
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(auto_cancel_pending, IntervalTrigger(minutes=1))
-    scheduler.start()
+        auto_cancel_stats["runs"] += 1
+        auto_cancel_stats["cancelled_total"] += cancelled
+        auto_cancel_stats["last_cancelled"] = cancelled
+        auto_cancel_stats["last_run_at"] = datetime.now().isoformat()
+        auto_cancel_stats["last_duration_ms"] = round((perf_counter() - started) * 1000, 1)
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
 
-    atexit.register(lambda: scheduler.shutdown())
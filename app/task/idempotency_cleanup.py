@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from app.core import config
+from app.database.session import SessionLocal
+from app.repository.common import db_time_ago
+from app.repository.idempotency_repository import IdempotencyKeyRepository
+
+
+async def purge_idempotency_keys():
+    """
+    Deletes recorded Idempotency-Keys older than IDEMPOTENCY_TTL_SECONDS, after which a key may be reused.
+    """
+    db = SessionLocal(info={"use_primary": True})
+    try:
+        before = db_time_ago(db, timedelta(seconds=config.IDEMPOTENCY_TTL_SECONDS))
+        await IdempotencyKeyRepository(db).delete_created_before(before)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
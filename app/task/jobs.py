@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import config
+from app.database.session import get_db_session
+from app.repository.common import db_time_ago, db_time_in
+from app.repository.job_repository import JobRepository
+from app.task.auto_cancel import auto_cancel_pending
+from app.task.idempotency_cleanup import purge_idempotency_keys
+from app.task.order_archiver import archive_finished_orders
+from app.task.reservation_sweeper import sweep_expired_reservations
+
+
+async def purge_finished_jobs():
+    """Deletes DONE and FAILED jobs that finished more than JOB_RETENTION_HOURS ago."""
+    async with get_db_session() as db:
+        before = db_time_ago(db, timedelta(hours=config.JOB_RETENTION_HOURS))
+        await JobRepository(db).delete_finished_before(before)
+
+
+# job handlers by name, each is awaited with the job payload as keyword arguments
+HANDLERS = {
+    "auto_cancel_pending": auto_cancel_pending,
+    "sweep_expired_reservations": sweep_expired_reservations,
+    "purge_idempotency_keys": purge_idempotency_keys,
+    "purge_finished_jobs": purge_finished_jobs,
+    "archive_finished_orders": archive_finished_orders,
+}
+
+# periodic jobs and their interval in seconds, the next run is queued when the previous one finishes
+PERIODIC = {
+    "auto_cancel_pending": config.AUTO_CANCEL_INTERVAL_SECONDS,
+    "sweep_expired_reservations": config.RESERVATION_SWEEP_SECONDS,
+    "purge_idempotency_keys": 3600,
+    "purge_finished_jobs": 3600,
+    "archive_finished_orders": config.ORDER_ARCHIVE_INTERVAL_SECONDS,
+}
+
+
+async def enqueue(
+    db: AsyncSession, name: str, payload: dict | None = None, delay: float = 0
+) -> bool:
+    """
+    Queues a one-off job in the caller's transaction, so it only runs if the transaction commits.
+    Args:
+        db (AsyncSession): The session of the calling request or job.
+        name (str): The handler name, a key of HANDLERS.
+        payload (dict | None): The JSON serializable keyword arguments of the handler.
+        delay (float): How long to wait before running the job, in seconds.
+    Returns:
+        bool: Whether the job was queued.
+    """
+    if name not in HANDLERS:
+        raise ValueError(f"Unknown job: {name}")
+    run_at = db_time_in(db, timedelta(seconds=delay))
+    return await JobRepository(db).enqueue(name, payload, run_at, config.JOB_MAX_ATTEMPTS)
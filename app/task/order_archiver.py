@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from app.core import config
+from app.database.session import SessionLocal
+from app.repository.common import db_time_ago
+from app.repository.order_repository import OrderRepository
+
+
+async def archive_finished_orders():
+    """
+    Moves DONE and cancelled orders untouched for ORDER_ARCHIVE_AFTER_DAYS to the archive tables.
+    Orders are moved in chunks of ORDER_ARCHIVE_BATCH, each chunk committing on its own.
+    """
+    db = SessionLocal(info={"use_primary": True})
+    try:
+        orders = OrderRepository(db)
+        before = db_time_ago(db, timedelta(days=config.ORDER_ARCHIVE_AFTER_DAYS))
+        while await orders.archive_finished(before, config.ORDER_ARCHIVE_BATCH):
+            await db.commit()
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from app.core import config
+from app.database.session import SessionLocal
+from app.repository.inventory_repository import SellerInventoryRepository
+from app.repository.reservation_repository import StockReservationRepository
+
+
+async def sweep_expired_reservations():
+    """
+    Returns the stock of expired cart holds to their inventories.
+    Holds are deleted in chunks of RESERVATION_SWEEP_BATCH rows, each chunk restoring the stock
+    of all its inventories with one UPDATE and committing on its own.
+    """
+    db = SessionLocal(info={"use_primary": True})
+    try:
+        reservations = StockReservationRepository(db)
+        inventories = SellerInventoryRepository(db)
+        now = datetime.now()
+        while True:
+            released = await reservations.release_expired(now, config.RESERVATION_SWEEP_BATCH)
+            if not released:
+                break
+            await inventories.increment_stock(released)
+            await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from app.core import config
+from app.database.session import get_db_session
+from app.models.job import Job
+from app.repository.common import db_time_ago, db_time_in
+from app.repository.job_repository import JobRepository
+from app.task.jobs import HANDLERS, PERIODIC
+from app.utils.enums import JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """
+    JobWorker runs the jobs of the jobs table, usually in its own process (`python -m app.worker`).
+    Features:
+    - Claims up to `batch_size` due jobs at a time with FOR UPDATE SKIP LOCKED, so any number of workers
+      (processes or web workers running it in-process) share the queue without running a job twice.
+    - A failed job is retried with exponential backoff (JOB_RETRY_BASE_SECONDS doubling up to
+      JOB_RETRY_MAX_SECONDS) until it has used its attempts, then it is marked FAILED with its last error.
+    - Periodic jobs (PERIODIC) are queued on start, and each run queues the next one after its interval.
+      Their dedupe key keeps a single occurrence outstanding across all workers.
+    - A job still RUNNING after JOB_LOCK_TIMEOUT_SECONDS (its worker died) is claimed again.
+    - Failures are logged with their traceback, counters are reported through `stats()`.
+    Args:
+        poll_seconds (float): How long to sleep when no job is due.
+        batch_size (int): The maximum number of jobs claimed at once.
+    """
+
+    def __init__(self, poll_seconds: float, batch_size: int):
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self._stopping: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.last_job_at = None
+
+    def start(self) -> None:
+        """Runs the worker as a task of the current event loop (the web process mode)."""
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._stopping is not None:
+            self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._stopping is not None and not self._stopping.is_set(),
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+            "last_job_at": self.last_job_at,
+        }
+
+    async def run(self) -> None:
+        self._stopping = asyncio.Event()
+        await self._schedule_periodic(PERIODIC)
+        while not self._stopping.is_set():
+            try:
+                jobs = await self._claim()
+            except Exception:
+                logger.exception("Claiming jobs failed")
+                jobs = []
+            for job in jobs:
+                await self._execute(job)
+            if not jobs:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _claim(self) -> list[Job]:
+        async with get_db_session() as db:
+            stale_before = db_time_ago(db, timedelta(seconds=config.JOB_LOCK_TIMEOUT_SECONDS))
+            return await JobRepository(db).claim(stale_before, self.batch_size)
+
+    async def _execute(self, job: Job) -> None:
+        started = perf_counter()
+        try:
+            handler = HANDLERS.get(job.name)
+            if handler is None:
+                raise LookupError(f"Unknown job: {job.name}")
+            await handler(**(job.payload or {}))
+        except Exception as e:
+            logger.exception(
+                "Job %s (%s) failed on attempt %s/%s",
+                job.name,
+                job.id,
+                job.attempts,
+                job.max_attempts,
+            )
+            await self._record_failure(job, f"{type(e).__name__}: {e}")
+        else:
+            logger.debug("Job %s (%s) took %.1f ms", job.name, job.id, (perf_counter() - started) * 1000)
+            async with get_db_session() as db:
+                await JobRepository(db).finish(job.id, JobStatus.DONE)
+                await self._queue_next(db, job)
+            self.succeeded += 1
+        self.last_job_at = datetime.now().isoformat()
+
+    async def _record_failure(self, job: Job, error: str) -> None:
+        async with get_db_session() as db:
+            repo = JobRepository(db)
+            if job.attempts < job.max_attempts:
+                backoff = min(
+                    config.JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1),
+                    config.JOB_RETRY_MAX_SECONDS,
+                )
+                await repo.retry(job.id, db_time_in(db, timedelta(seconds=backoff)), error)
+                self.retried += 1
+            else:
+                await repo.finish(job.id, JobStatus.FAILED, error)
+                await self._queue_next(db, job)
+                self.failed += 1
+
+    async def _queue_next(self, db, job: Job) -> None:
+        interval = PERIODIC.get(job.name)
+        if interval is not None and job.dedupe_key is not None:
+            run_at = db_time_in(db, timedelta(seconds=interval))
+            await JobRepository(db).enqueue(
+                job.name, None, run_at, config.JOB_MAX_ATTEMPTS, job.name
+            )
+
+    async def _schedule_periodic(self, periodic: dict[str, float]) -> None:
+        try:
+            async with get_db_session() as db:
+                repo = JobRepository(db)
+                for name in periodic:
+                    await repo.enqueue(
+                        name, None, db_time_in(db), config.JOB_MAX_ATTEMPTS, name
+                    )
+        except Exception:
+            logger.exception("Queueing periodic jobs failed")
+
+
+job_worker = JobWorker(config.JOB_POLL_SECONDS, config.JOB_BATCH_SIZE)
@@ -14,3 +14,23 @@ class OrderStatus(str, enum.Enum):
     DONE = "DONE"
     CANCELLED = "CANCELLED"
     AUTO_CANCELLED = "AUTO_CANCELLED"
+
+
+class CountStrategy(str, enum.Enum):
+    EXACT = "exact"
+    WINDOW = "window"
+    CAPPED = "capped"
+    CACHED = "cached"
+
+
+class TotalKind(str, enum.Enum):
+    EXACT = "exact"
+    AT_LEAST = "at_least"
+    CACHED = "cached"
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
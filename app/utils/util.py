@@ -1,9 +1,12 @@
 from datetime import datetime, timedelta
+import hashlib
+import time
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core import config
+from app.core.cache import token_cache
 from app.utils.enums import OrderStatus
 
 import os
@@ -35,11 +38,18 @@ def create_access_token(data: dict) -> str:
 
 
 def verify_token(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, config.SECRET_KEY, algorithms=config.ALGORITHM)
-        return payload
     except JWTError:
         return None
+    ttl = payload.get("exp", 0) - time.time()
+    if ttl > 0:
+        token_cache.set(key, payload, ttl=ttl)
+    return payload
 
 
 def valid_status_transition(current: str, new: str) -> bool:
@@ -87,7 +97,7 @@ def delete_file(url_path: str | None) -> None:
             os.remove(local_path)
 
 
-def get_user_from_token(auth_header: str) -> str | None:
+def get_claims_from_token(auth_header: str) -> dict | None:
     if not auth_header or not auth_header.startswith("Bearer "):
         return None
 
@@ -95,5 +105,4 @@ def get_user_from_token(auth_header: str) -> str | None:
     payload = verify_token(token)
     if not payload:
         return None
-    user_id: str = payload.get("data", {}).get("user_id")
-    return user_id
+    return payload.get("data")
@@ -0,0 +1,28 @@
+# Job worker entry point: python -m app.worker
+import asyncio
+import logging
+import signal
+
+from app.database.session import engine, replica_engine
+from app.services.password_service import password_service
+from app.task.worker import job_worker
+
+
+async def main():
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: asyncio.ensure_future(job_worker.stop()))
+    try:
+        await job_worker.run()
+    finally:
+        password_service.shutdown()
+        await engine.dispose()
+        if replica_engine is not None:
+            await replica_engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+"""
+Checkout contention benchmark: python -m scripts.bench_checkout [--mode conditional]
+
+Fires `--checkouts` concurrent stock decrements (at most `--concurrency` in flight) at one inventory
+row holding `--stock` units, in the database of DATABASE_URL (migrated with `alembic upgrade head`,
+use a scratch database), and reports throughput, rejections, failures and the stock left.
+Modes:
+- locking: the old read-modify-write, SELECT ... FOR UPDATE, check in Python, write the row back.
+- conditional: SellerInventoryRepository.decrement_stock, one UPDATE ... WHERE quantity >= :n.
+- checkout: the full CartService.checkout of one buyer per decrement (orders, cart, and the
+  group-commit pipeline when CHECKOUT_GROUP_COMMIT_ENABLED is set).
+Run it once per mode against PostgreSQL to compare, SQLite serializes every writer anyway.
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from sqlalchemy import insert, select
+
+from app.core.exception import BusinessError
+from app.database.session import SessionLocal, engine
+from app.models.cart import CartItem
+from app.models.inventory import SellerInventory
+from app.models.product import Product
+from app.models.user import User
+from app.repository.inventory_repository import SellerInventoryRepository
+from app.services.cart_service import CartService
+from app.services.checkout_pipeline import checkout_pipeline
+from app.utils.enums import RoleEnum
+
+
+async def seed(stock: int, buyers: int) -> tuple[str, list[str]]:
+    """Creates a seller with one inventory of `stock` units, and `buyers` buyers with it in their cart."""
+    async with SessionLocal() as db:
+        seller_id, product_id, inventory_id = str(uuid4()), str(uuid4()), str(uuid4())
+        db.add(User(id=seller_id, name="bench", username=f"bench-{seller_id}", role=RoleEnum.SELLER))
+        db.add(Product(id=product_id, name=f"bench-{product_id}", description="bench"))
+        await db.flush()
+        db.add(
+            SellerInventory(
+                id=inventory_id, seller_id=seller_id, product_id=product_id, price=1, quantity=stock
+            )
+        )
+        buyer_ids = [str(uuid4()) for _ in range(buyers)]
+        if buyer_ids:
+            await db.execute(
+                insert(User),
+                [
+                    {"id": buyer_id, "name": "bench", "username": f"bench-{buyer_id}", "role": RoleEnum.BUYER}
+                    for buyer_id in buyer_ids
+                ],
+            )
+            await db.flush()
+            await db.execute(
+                insert(CartItem),
+                [
+                    {"id": str(uuid4()), "buyer_id": buyer_id, "seller_inventory_id": inventory_id, "quantity": 1}
+                    for buyer_id in buyer_ids
+                ],
+            )
+        await db.commit()
+        return inventory_id, buyer_ids
+
+
+async def decrement_locking(inventory_id: str, _: str | None) -> None:
+    async with SessionLocal(info={"use_primary": True}) as db:
+        inventory = await db.scalar(
+            select(SellerInventory).where(SellerInventory.id == inventory_id).with_for_update()
+        )
+        if inventory.quantity < 1:
+            await db.rollback()
+            raise BusinessError("Stock not enough")
+        inventory.quantity -= 1
+        await db.commit()
+
+
+async def decrement_conditional(inventory_id: str, _: str | None) -> None:
+    async with SessionLocal(info={"use_primary": True}) as db:
+        if not await SellerInventoryRepository(db).decrement_stock({inventory_id: 1}):
+            await db.rollback()
+            raise BusinessError("Stock not enough")
+        await db.commit()
+
+
+async def checkout(_: str, buyer_id: str | None) -> None:
+    async with SessionLocal() as db:
+        await CartService(db).checkout(buyer_id)
+
+
+MODES = {
+    "locking": decrement_locking,
+    "conditional": decrement_conditional,
+    "checkout": checkout,
+}
+
+
+async def bench(mode: str, checkouts: int, concurrency: int, stock: int) -> None:
+    inventory_id, buyer_ids = await seed(stock, checkouts if mode == "checkout" else 0)
+    run = MODES[mode]
+    slots = asyncio.Semaphore(concurrency)
+    counts = {"succeeded": 0, "rejected": 0, "failed": 0}
+
+    async def one(buyer_id: str | None) -> None:
+        async with slots:
+            try:
+                await run(inventory_id, buyer_id)
+                counts["succeeded"] += 1
+            except BusinessError:
+                counts["rejected"] += 1
+            except Exception:
+                counts["failed"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(buyer_ids[i] if buyer_ids else None) for i in range(checkouts)))
+    elapsed = time.perf_counter() - started
+
+    async with SessionLocal() as db:
+        left = await SellerInventoryRepository(db).get_stock(inventory_id)
+    print(f"mode: {mode}, checkouts: {checkouts}, concurrency: {concurrency}, stock: {stock}")
+    print(f"elapsed: {elapsed:.2f} s, throughput: {checkouts / elapsed:.1f} checkouts/s")
+    print(", ".join(f"{key}: {value}" for key, value in counts.items()))
+    print(f"stock left: {left} (expected {stock - counts['succeeded']})")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=list(MODES), default="conditional")
+    parser.add_argument("--checkouts", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--stock", type=int, default=1500)
+    args = parser.parse_args()
+    try:
+        await bench(args.mode, args.checkouts, args.concurrency, args.stock)
+    finally:
+        await checkout_pipeline.shutdown()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""
+Sorted page latency benchmark: python -m scripts.bench_pagination [--rows 1000000]
+
+Seeds one seller with `--rows` orders (in the database of DATABASE_URL, migrated with
+`alembic upgrade head`, use a scratch database) and times the seller's order listing sorted by
+created_at and by total:
+- the first page,
+- a deep OFFSET page (`--deep-page`),
+- the page after it through the keyset cursor of the previous page.
+Each page is timed `--repeat` times, the median is reported. The total is computed with
+`--count-strategy` (PAGINATION_COUNT_STRATEGY by default). Seeding is skipped when the
+benchmark seller already has the requested number of orders.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import func, insert, select
+
+from app.core import config
+from app.database.session import SessionLocal, engine
+from app.models.order import Order
+from app.models.user import User
+from app.repository.common import encode_cursor
+from app.repository.order_repository import OrderRepository
+from app.utils.enums import CountStrategy, OrderStatus, RoleEnum
+
+SELLER = "bench-seller"
+BUYER = "bench-buyer"
+CHUNK = 10000
+
+
+async def seed(rows: int) -> str:
+    async with SessionLocal() as db:
+        users = {}
+        for username, role in ((SELLER, RoleEnum.SELLER), (BUYER, RoleEnum.BUYER)):
+            user_id = await db.scalar(select(User.id).where(User.username == username))
+            if user_id is None:
+                user_id = str(uuid4())
+                db.add(User(id=user_id, name=username, username=username, role=role))
+            users[role] = user_id
+        await db.commit()
+
+        seller_id, buyer_id = users[RoleEnum.SELLER], users[RoleEnum.BUYER]
+        existing = await db.scalar(
+            select(func.count()).select_from(Order).where(Order.seller_id == seller_id)
+        )
+        start = datetime(2024, 1, 1)
+        for offset in range(existing, rows, CHUNK):
+            await db.execute(
+                insert(Order),
+                [
+                    {
+                        "id": str(uuid4()),
+                        "buyer_id": buyer_id,
+                        "seller_id": seller_id,
+                        "status": OrderStatus.PENDING,
+                        "created_at": start + timedelta(seconds=i),
+                        "updated_at": start + timedelta(seconds=i),
+                        "total": round(random.uniform(1, 1000), 2),
+                        "item_count": 1,
+                    }
+                    for i in range(offset, min(offset + CHUNK, rows))
+                ],
+            )
+            await db.commit()
+            print(f"seeded {min(offset + CHUNK, rows)}/{rows}", end="\r", flush=True)
+        print()
+        return seller_id
+
+
+async def timed(fn, repeat: int) -> tuple[float, object]:
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await fn()
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations), result
+
+
+async def bench(seller_id: str, size: int, deep_page: int, repeat: int) -> None:
+    print(f"count strategy: {config.PAGINATION_COUNT_STRATEGY}")
+    print(f"{'sort_by':<12}{'page':<24}{'median ms':>10}")
+    async with SessionLocal() as db:
+        repo = OrderRepository(db)
+        for sort_by in ("created_at", "total"):
+
+            def page(skip: int, cursor: str | None = None):
+                return lambda: repo.find_orders_by_seller(
+                    skip, size, sort_by, "desc", seller_id, cursor=cursor
+                )
+
+            first, _ = await timed(page(0), repeat)
+            skip = (deep_page - 1) * size
+            deep, result = await timed(page(skip), repeat)
+            if not result.data:
+                raise SystemExit(f"page {deep_page} is empty, seed more rows or lower --deep-page")
+            last = result.data[-1]
+            cursor = encode_cursor(getattr(last, sort_by), last.id)
+            keyset, _ = await timed(page(0, cursor), repeat)
+
+            print(f"{sort_by:<12}{'first page':<24}{first:>10.1f}")
+            print(f"{sort_by:<12}{f'page {deep_page} (offset)':<24}{deep:>10.1f}")
+            print(f"{sort_by:<12}{f'page {deep_page + 1} (cursor)':<24}{keyset:>10.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--deep-page", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--count-strategy",
+        choices=[strategy.value for strategy in CountStrategy],
+        default=config.PAGINATION_COUNT_STRATEGY,
+    )
+    args = parser.parse_args()
+    config.PAGINATION_COUNT_STRATEGY = args.count_strategy
+    try:
+        seller_id = await seed(args.rows)
+        await bench(seller_id, args.size, args.deep_page, args.repeat)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())